@@ -0,0 +1,222 @@
+"""
+Replay a corpus of webhook requests against the appointment scheduler app.
+
+src.main:app runs in process with its lifespan. Google Calendar and Google
+Sheets are replaced by fakes, so no credentials or network are needed.
+Reports throughput, latency percentiles and memory allocated per request
+for every tag, and writes the results as JSON to compare commits.
+
+The fake calendar is busy every day from 10:00 to 11:00 and from 15:00 to
+15:30. Like the real client its calls block, for --calendar-latency-ms on
+every call, the thread calendar_apis runs them on.
+
+Run from the Appointment-Scheduler-Agent directory:
+
+    python -m benchmarks.replay --requests 5000 --concurrency 32 --output replay.json
+"""
+
+import os
+
+# Offline defaults, the replay never calls Google
+os.environ.setdefault("X_API_KEY", "replay")
+os.environ.setdefault("WARM_UP", "false")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import datetime  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+import time  # noqa: E402
+from typing import Any, Dict, List  # noqa: E402
+
+import pytz  # noqa: E402
+
+from benchmarks.asgi_replay import (  # noqa: E402
+    environment,
+    load_corpus,
+    measure_allocations,
+    print_results,
+    replay,
+)
+from src import config  # noqa: E402
+from src.calendar_utils import calendar_apis  # noqa: E402
+from src.main import app  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay_corpus.json")
+
+# Daily busy periods of the fake calendar, local time
+BUSY_PERIODS = [("10:00", "11:00"), ("15:00", "15:30")]
+TIMEZONE = "Asia/Kolkata"
+
+SHEET_HEADERS = ["Name", "Email", "Status", "Timestamp", "MeetingTime"]
+
+
+class FakeRequest:
+    def __init__(self, result: Dict[str, Any], latency: float) -> None:
+        self.result = result
+        self.latency = latency
+
+    def execute(self) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.result
+
+
+class FakeEvents:
+    def __init__(self, calendar: "FakeCalendarService") -> None:
+        self.calendar = calendar
+
+    def list(self, timeMin: str, timeMax: str, **kwargs: Any) -> FakeRequest:
+        start = datetime.datetime.fromisoformat(timeMin)
+        end = datetime.datetime.fromisoformat(timeMax)
+        self.calendar.lists += 1
+        return FakeRequest({"items": busy_events(start, end)}, self.calendar.latency)
+
+    def insert(self, calendarId: str, body: Dict[str, Any]) -> FakeRequest:
+        # Inserted events are counted, not stored, so every request of a long
+        # replay sees the same calendar
+        self.calendar.inserts += 1
+        event = {"id": f"replay-{self.calendar.inserts}", "status": "confirmed", **body}
+        return FakeRequest(event, self.calendar.latency)
+
+
+class FakeCalendarService:
+    """The part of the Calendar v3 service used by calendar_apis."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.lists = 0
+        self.inserts = 0
+
+    def events(self) -> FakeEvents:
+        return FakeEvents(self)
+
+
+def busy_events(start: datetime.datetime, end: datetime.datetime) -> List[Dict]:
+    """Events of the fake calendar overlapping [start, end)."""
+    tz = pytz.timezone(TIMEZONE)
+    events = []
+    day = start.astimezone(tz).date()
+    while day <= end.astimezone(tz).date():
+        for busy_start, busy_end in BUSY_PERIODS:
+            event_start = tz.localize(
+                datetime.datetime.combine(
+                    day, datetime.datetime.strptime(busy_start, "%H:%M").time()
+                )
+            )
+            event_end = tz.localize(
+                datetime.datetime.combine(
+                    day, datetime.datetime.strptime(busy_end, "%H:%M").time()
+                )
+            )
+            if event_start < end and event_end > start:
+                events.append(
+                    {
+                        "start": {"dateTime": event_start.isoformat()},
+                        "end": {"dateTime": event_end.isoformat()},
+                    }
+                )
+        day += datetime.timedelta(days=1)
+    return events
+
+
+class FakeWorksheet:
+    def __init__(self) -> None:
+        self.appended = 0
+
+    def row_values(self, row: int) -> List[str]:
+        return list(SHEET_HEADERS)
+
+    def append_row(self, values: List[Any], value_input_option: str) -> None:
+        self.appended += 1
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheet: FakeWorksheet) -> None:
+        self._worksheet = worksheet
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        return self._worksheet
+
+
+class FakeSheetsClient:
+    """The part of an authorized gspread client used by calendar_apis."""
+
+    def __init__(self) -> None:
+        self.sheet = FakeWorksheet()
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        return FakeSpreadsheet(self.sheet)
+
+
+def use_fake_backends(latency: float) -> Dict[str, Any]:
+    """Point calendar_apis at the fake calendar and sheet."""
+    calendar = FakeCalendarService(latency)
+    sheets = FakeSheetsClient()
+    calendar_apis.service = calendar
+    calendar_apis.get_sheets_client = lambda: sheets
+    return {"calendar": calendar, "sheets": sheets}
+
+
+async def run(
+    corpus_path: str,
+    requests: int,
+    concurrency: int,
+    allocation_rounds: int,
+    calendar_latency: float,
+    output: str | None,
+) -> None:
+    corpus = load_corpus(corpus_path)
+    backends = use_fake_backends(calendar_latency)
+
+    async with app.router.lifespan_context(app):
+        await replay(app, corpus, len(corpus), 1, config.X_API_KEY)
+        results = {
+            "app": "Appointment-Scheduler-Agent",
+            "corpus": os.path.abspath(corpus_path),
+            "environment": environment(),
+            "calendar_latency_ms": calendar_latency * 1000,
+            "replay": await replay(
+                app, corpus, requests, concurrency, config.X_API_KEY
+            ),
+            "allocations": await measure_allocations(
+                app, corpus, allocation_rounds, config.X_API_KEY
+            ),
+            "backend_calls": {
+                "calendar_lists": backends["calendar"].lists,
+                "calendar_inserts": backends["calendar"].inserts,
+                "sheet_appends": backends["sheets"].sheet.appended,
+            },
+        }
+
+    print_results(results)
+    if output:
+        with open(output, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--allocation-rounds", type=int, default=5)
+    parser.add_argument("--calendar-latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    # Handler logs would dominate the measurement
+    logging.getLogger().setLevel(args.log_level)
+
+    asyncio.run(
+        run(
+            args.corpus,
+            args.requests,
+            args.concurrency,
+            args.allocation_rounds,
+            args.calendar_latency_ms / 1000,
+            args.output,
+        )
+    )
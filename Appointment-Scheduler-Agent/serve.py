@@ -0,0 +1,63 @@
+"""
+Production entry point, several uvicorn workers and no reloader.
+
+On SIGTERM the workers stop accepting connections, finish the requests in
+flight for up to --graceful-timeout seconds and then run their shutdown.
+
+With more than one worker the stored webhook responses are shared through
+SQLite, in webhook_responses.db unless IDEMPOTENCY_DB_PATH is set, and the
+metrics through snapshot files in METRICS_DIR, a new temporary directory
+unless it is set.
+
+    python serve.py --workers 4 --port 5000
+
+run.py stays the development entry point with auto reload.
+"""
+
+import argparse
+import os
+import tempfile
+
+import uvicorn
+
+from src.metrics import clear_directory
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "5000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+    )
+    # auto picks uvloop and httptools from requirements.txt when installed
+    parser.add_argument("--loop", default="auto")
+    parser.add_argument("--http", default="auto")
+    parser.add_argument("--graceful-timeout", type=int, default=10)
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
+
+    if args.workers > 1 and not os.getenv("IDEMPOTENCY_DB_PATH"):
+        # A retry of a call may reach another worker, with responses kept in
+        # memory only it runs the handler again and books a second appointment
+        os.environ["IDEMPOTENCY_DB_PATH"] = "webhook_responses.db"
+
+    if os.getenv("METRICS_DIR"):
+        # Counters start over with the workers
+        clear_directory(os.environ["METRICS_DIR"])
+    elif args.workers > 1:
+        # Every scrape reaches one worker, it adds up the snapshots of all
+        os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="webhook-metrics-")
+
+    uvicorn.run(
+        "src.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        access_log=args.access_log,
+    )
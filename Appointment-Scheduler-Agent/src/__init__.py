@@ -1,9 +1,5 @@
-import logging
-import sys
+import logging  # noqa: F401
 
+from src.json_logging import setup_logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
-)
+setup_logging()
@@ -9,6 +9,7 @@ from src.schemas import (
     Text,
 )
 from src.calendar_utils.calendar_apis import is_slot_free
+from src.registry import registry
 
 
 def simple_format_meeting(meeting_date: Dict[str, Any], meeting_time: Dict[str, Any]):
@@ -26,6 +27,10 @@ def simple_format_meeting(meeting_date: Dict[str, Any], meeting_time: Dict[str,
 TARGET_PAGE = "projects/youtube-dialogflow-cx/locations/global/agents/060a498a-c554-4c86-bbce-0c55aafa23dd/flows/08c71139-88ae-49f7-923d-885d7c562db7/pages/6d592956-1707-4d29-987b-6e9ed2b90f26"
 
 
+@registry.handler(
+    "checkSlotAvailability",
+    fallback="Checking availability is taking longer than expected, please try again.",
+)
 async def check_slot_availability(webhook_request: WebhookRequest) -> WebhookResponse:
     """TODO
     1. we first extract the meeting_date and meeting_time
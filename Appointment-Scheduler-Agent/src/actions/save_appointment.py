@@ -1,5 +1,6 @@
+import asyncio
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Set
 
 from src.schemas import (
     FulfillmentResponse,
@@ -11,9 +12,17 @@ from src.schemas import (
 from src.calendar_utils.calendar_apis import create_event, append_to_google_sheet
 
 from src import logging
+from src.idempotency import webhook_idempotency
+from src.registry import registry, remaining
 
 logger = logging.getLogger(__name__)
 
+# With less time left the sheet row is written after the response
+SHEET_MIN_SECONDS = 1.0
+
+# Keeps the deferred sheet writes alive until they finish
+_background_writes: Set[asyncio.Task] = set()
+
 
 def simple_format_meeting(meeting_date: Dict[str, Any], meeting_time: Dict[str, Any]):
     dt = datetime(
@@ -27,13 +36,21 @@ def simple_format_meeting(meeting_date: Dict[str, Any], meeting_time: Dict[str,
     return dt.strftime("%B %d, %Y at %I:%M %p")
 
 
+def _sheet_write_done(task: asyncio.Task) -> None:
+    _background_writes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Deferred sheet write failed: {task.exception()}")
+
+
+# Dialogflow retries a timed out call, a retry must not book the slot twice
+@registry.handler("saveAppointment", middleware=[webhook_idempotency.middleware])
 async def save_appointment(webhook_request: WebhookRequest) -> WebhookResponse:
     await create_event(
         meeting_date=webhook_request.sessionInfo.parameters["meeting_date"],
         meeting_time=webhook_request.sessionInfo.parameters["meeting_time"],
     )
 
-    await append_to_google_sheet(
+    sheet_write = append_to_google_sheet(
         input_dict={
             "Name": webhook_request.sessionInfo.parameters["client_name"]["name"],
             "Email": webhook_request.sessionInfo.parameters["client_email"],
@@ -46,6 +63,15 @@ async def save_appointment(webhook_request: WebhookRequest) -> WebhookResponse:
         }
     )
 
+    # The event is what books the slot, the sheet row is only the record of it
+    seconds_left = remaining()
+    if seconds_left is not None and seconds_left < SHEET_MIN_SECONDS:
+        task = asyncio.create_task(sheet_write)
+        _background_writes.add(task)
+        task.add_done_callback(_sheet_write_done)
+    else:
+        await sheet_write
+
     return WebhookResponse(
         fulfillmentResponse=FulfillmentResponse(
             messages=[
@@ -7,10 +7,15 @@ from src.schemas import (
     WebhookRequest,
     Text,
 )
+from src.registry import registry
 
 from src.calendar_utils.calendar_apis import get_random_free_slots
 
 
+@registry.handler(
+    "showUpcomingSlots",
+    fallback="Finding free slots is taking longer than expected, please try again.",
+)
 async def show_upcoming_slots(webhook_request: WebhookRequest) -> WebhookResponse:
     """TODO
     1. we want to fetch the free slots
@@ -7,12 +7,17 @@ from src.schemas import (
     WebhookRequest,
     Text,
 )
+from src.registry import registry
 from src.calendar_utils.calendar_apis import get_free_slots_for_day
 
 
 TARGET_PAGE = "projects/youtube-dialogflow-cx/locations/global/agents/060a498a-c554-4c86-bbce-0c55aafa23dd/flows/08c71139-88ae-49f7-923d-885d7c562db7/pages/6d592956-1707-4d29-987b-6e9ed2b90f26"
 
 
+@registry.handler(
+    "showUpcomingSlotsForTheDay",
+    fallback="Checking that day is taking longer than expected, please try again.",
+)
 async def show_upcoming_slots_for_the_day(
     webhook_request: WebhookRequest,
 ) -> WebhookResponse:
@@ -1,12 +1,10 @@
+import asyncio
 import random
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
 
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from google.oauth2.service_account import Credentials
 import pytz
-import gspread
 
 from src import config
 
@@ -19,7 +17,12 @@ WORKING_DAY_W_START_END_TIME = {
 }
 
 
+# The Google clients are imported where they are used, importing them takes a
+# while and main.py warms them up in the background instead
 def get_calendar_service():
+    from google.oauth2 import service_account
+    from googleapiclient.discovery import build
+
     credentials = service_account.Credentials.from_service_account_info(
         info=config.SERVICE_ACCOUNT_JSON,
         scopes=["https://www.googleapis.com/auth/calendar"],
@@ -28,15 +31,48 @@ def get_calendar_service():
     return service
 
 
-service = get_calendar_service()
+# Built on first use, so importing the module needs no credentials and the
+# replay benchmark can put a fake service here instead
+service = None
+
+
+def get_service():
+    global service
+    if service is None:
+        service = get_calendar_service()
+    return service
+
+
+# The Calendar client blocks on its HTTP calls and is not thread safe, so they
+# run one at a time on their own thread. The event loop stays free and a
+# handler past its deadline stops waiting for them
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calendar")
+
+
+async def execute(request: Any) -> Dict[str, Any]:
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, request.execute
+    )
 
 
 async def append_to_google_sheet(input_dict: Dict[str, Any]) -> None:
+    # gspread blocks too, every call gets its own client
+    await asyncio.to_thread(_append_to_google_sheet, input_dict)
+
+
+def get_sheets_client():
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     scopes = ["https://www.googleapis.com/auth/spreadsheets"]
     credentials = Credentials.from_service_account_info(
         info=config.SERVICE_ACCOUNT_JSON, scopes=scopes
     )
-    client = gspread.authorize(credentials)
+    return gspread.authorize(credentials)
+
+
+def _append_to_google_sheet(input_dict: Dict[str, Any]) -> None:
+    client = get_sheets_client()
 
     sheet = client.open_by_key(config.GOOGLE_SHEET_ID).worksheet("Sheet1")
     existing_headers = sheet.row_values(1)
@@ -57,8 +93,9 @@ async def get_random_free_slots(
 
     free_slots = []
 
-    events_result = (
-        service.events()
+    events_result = await execute(
+        get_service()
+        .events()
         .list(
             calendarId=config.GOOGLE_CALENDAR_ID,
             timeMin=now.isoformat(),
@@ -66,7 +103,6 @@ async def get_random_free_slots(
             singleEvents=True,
             orderBy="startTime",
         )
-        .execute()
     )
     events = events_result.get("items", [])
 
@@ -137,8 +173,9 @@ async def is_slot_free(
     )
     slot_end = dt + datetime.timedelta(minutes=config.MEETING_TIME)
 
-    events_result = (
-        service.events()
+    events_result = await execute(
+        get_service()
+        .events()
         .list(
             calendarId=config.GOOGLE_CALENDAR_ID,
             timeMin=dt.isoformat(),
@@ -146,7 +183,6 @@ async def is_slot_free(
             singleEvents=True,
             orderBy="startTime",
         )
-        .execute()
     )
 
     events = events_result.get("items", [])
@@ -184,13 +220,13 @@ async def create_event(
         },
     }
 
-    event_result = (
-        service.events()
+    event_result = await execute(
+        get_service()
+        .events()
         .insert(
             calendarId=config.GOOGLE_CALENDAR_ID,
             body=event,
         )
-        .execute()
     )
 
     return event_result
@@ -227,8 +263,9 @@ async def get_free_slots_for_day(
     end_of_day = tz.localize(datetime.datetime.combine(date.date(), work_end))
 
     # Fetch events only for that single day
-    events_result = (
-        service.events()
+    events_result = await execute(
+        get_service()
+        .events()
         .list(
             calendarId=config.GOOGLE_CALENDAR_ID,
             timeMin=start_of_day.isoformat(),
@@ -236,7 +273,6 @@ async def get_free_slots_for_day(
             singleEvents=True,
             orderBy="startTime",
         )
-        .execute()
     )
     events = events_result.get("items", [])
 
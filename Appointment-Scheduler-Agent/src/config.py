@@ -1,5 +1,6 @@
 import os
 import json
+from typing import Any
 
 from dotenv import load_dotenv, find_dotenv
 
@@ -7,8 +8,60 @@ load_dotenv(find_dotenv())
 
 X_API_KEY = os.getenv("X_API_KEY")
 
-SERVICE_ACCOUNT_JSON = json.loads(os.getenv("SERVICE_ACCOUNT_JSON"))
+# Comma separated fulfillment tags of the agent, checked against the handlers at startup
+AGENT_TAGS = [
+    tag.strip() for tag in os.getenv("AGENT_TAGS", "").split(",") if tag.strip()
+]
+
+# Validate webhook requests from the raw body and skip response re-validation
+WEBHOOK_FAST_JSON = os.getenv("WEBHOOK_FAST_JSON", "true").lower() == "true"
+
+# Validate intentInfo, pageInfo and messages only when a handler reads them,
+# needs WEBHOOK_FAST_JSON
+WEBHOOK_LAZY_VALIDATION = (
+    os.getenv("WEBHOOK_LAZY_VALIDATION", "false").lower() == "true"
+)
+
+# Seconds a handler has to answer, Dialogflow gives up on a webhook after 5 s
+# by default. Tags can get their own budget, as tag=seconds,tag=seconds
+WEBHOOK_DEADLINE_SECONDS = float(os.getenv("WEBHOOK_DEADLINE_SECONDS", "4.0"))
+WEBHOOK_TAG_DEADLINES = {
+    tag.strip(): float(seconds)
+    for tag, seconds in (
+        entry.split("=", 1)
+        for entry in os.getenv("WEBHOOK_TAG_DEADLINES", "").split(",")
+        if entry.strip()
+    )
+}
+
+# Responses of confirming handlers are kept this long to answer Dialogflow's
+# retries, in SQLite too when IDEMPOTENCY_DB_PATH is set
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_MAX_SIZE = int(os.getenv("IDEMPOTENCY_MAX_SIZE", "10000"))
+IDEMPOTENCY_DB_PATH = os.getenv("IDEMPOTENCY_DB_PATH", "")
+# A call claimed by a worker that died is run again after this long
+IDEMPOTENCY_CLAIM_SECONDS = float(os.getenv("IDEMPOTENCY_CLAIM_SECONDS", "30"))
+
+# Directory the workers share their metrics through, so /metrics answers the
+# totals of all of them, serve.py sets one when it starts several workers
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "1.0"))
+
+# Import the Google clients and build the Calendar service in the background
+# after startup instead of on the first request that needs them
+WARM_UP = os.getenv("WARM_UP", "true").lower() == "true"
+
 GOOGLE_CALENDAR_ID = os.getenv("GOOGLE_CALENDAR_ID")
 GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
 
 MEETING_TIME = 30
+
+
+def __getattr__(name: str) -> Any:
+    # SERVICE_ACCOUNT_JSON is parsed on first use, importing the config needs
+    # no credentials
+    if name == "SERVICE_ACCOUNT_JSON":
+        value = json.loads(os.getenv("SERVICE_ACCOUNT_JSON"))
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,58 +1,138 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 
 from src.utils import verify_api_key
-from src import logging
-from src.schemas import (
-    WebhookRequest,
-    WebhookResponse,
-    FulfillmentResponse,
-    Message,
-    Text,
+from src import config, logging
+from src.schemas import WebhookRequest, WebhookResponse
+from src.registry import deadline, registry
+from src.fast_json import WebhookJSONResponse, parse_webhook_request
+from src.metrics import webhook_metrics
+from src.idempotency import webhook_idempotency
+from src.warmup import warm_up
+from src.calendar_utils import calendar_apis
+
+# Importing the actions registers their tag handlers
+from src.actions import (  # noqa: F401
+    show_upcoming_slots,
+    check_slot_availability,
+    save_appointment,
+    show_upcoming_slots_for_the_day,
 )
-from src.actions.show_upcoming_slots import show_upcoming_slots
-from src.actions.check_slot_availability import check_slot_availability
-from src.actions.save_appointment import save_appointment
-from src.actions.show_upcoming_slots_for_the_day import show_upcoming_slots_for_the_day
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Dialogflow CX Webhook API")
+# Imported by the first request needing them unless warmed up at startup
+WARM_UP_MODULES = [
+    "google.oauth2.service_account",
+    "googleapiclient.discovery",
+    "gspread",
+]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    registry.log_tags(config.AGENT_TAGS)
+    await webhook_idempotency.open()
+    await webhook_metrics.open()
+
+    async def warm_up_and_get_ready() -> None:
+        if config.WARM_UP:
+            await warm_up(WARM_UP_MODULES, [calendar_apis.get_service])
+        app.state.ready = True
+
+    warm_up_task = asyncio.create_task(warm_up_and_get_ready())
+    yield
+    app.state.ready = False
+    warm_up_task.cancel()
+    await webhook_metrics.close()
+    await webhook_idempotency.close()
+
+
+app = FastAPI(title="Dialogflow CX Webhook API", lifespan=lifespan)
 
 templates = Jinja2Templates(directory="templates")
 
+registry.use(webhook_metrics.middleware)
+registry.use(
+    deadline(
+        config.WEBHOOK_DEADLINE_SECONDS,
+        registry.fallback_response,
+        config.WEBHOOK_TAG_DEADLINES,
+        on_fallback=webhook_metrics.record_fallback,
+    )
+)
+
 
 @app.get("/chat", response_class=HTMLResponse)
 async def read_item(request: Request):
     return templates.TemplateResponse(request=request, name="index.html")
 
 
-@app.post("/webhook", response_model=WebhookResponse)
-async def dialogflow_webhook(
-    webhook_request: WebhookRequest, is_verified: bool = Depends(verify_api_key)
-):
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        webhook_metrics.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness probe, 503 until the startup work and the warm-up are done."""
+    if not getattr(app.state, "ready", False):
+        return JSONResponse({"status": "starting"}, status_code=503)
+    return JSONResponse({"status": "ready"})
+
+
+async def handle_webhook(webhook_request: WebhookRequest) -> WebhookResponse:
     try:
-        tag = webhook_request.fulfillmentInfo.tag
-        if tag == "showUpcomingSlots":
-            return await show_upcoming_slots(webhook_request=webhook_request)
-        elif tag == "saveAppointment":
-            return await save_appointment(webhook_request=webhook_request)
-        elif tag == "checkSlotAvailability":
-            return await check_slot_availability(webhook_request=webhook_request)
-        elif tag == "showUpcomingSlotsForTheDay":
-            return await show_upcoming_slots_for_the_day(
-                webhook_request=webhook_request
-            )
-        else:
-            return WebhookResponse(
-                fulfillmentResponse=FulfillmentResponse(
-                    messages=[
-                        Message(text=Text(text=[f"No handler for the tag: {tag}"]))
-                    ]
-                )
-            )
+        return await registry.dispatch(webhook_request)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Webhook processing error: {str(e)}"
         )
+
+
+if config.WEBHOOK_FAST_JSON:
+
+    @app.post(
+        "/webhook",
+        response_model=WebhookResponse,
+        response_class=WebhookJSONResponse,
+    )
+    async def dialogflow_webhook(
+        request: Request,
+        is_verified: bool = Depends(verify_api_key),
+        webhook_request: WebhookRequest = Depends(parse_webhook_request),
+    ):
+        response = WebhookJSONResponse(await handle_webhook(webhook_request))
+        webhook_metrics.record_sizes(
+            webhook_request.fulfillmentInfo.tag,
+            len(await request.body()),
+            len(response.body),
+        )
+        return response
+
+else:
+
+    @app.post("/webhook", response_model=WebhookResponse)
+    async def dialogflow_webhook(
+        request: Request,
+        webhook_request: WebhookRequest,
+        is_verified: bool = Depends(verify_api_key),
+    ):
+        # Rendered here as FastAPI would render it, to know its size
+        response = JSONResponse(
+            jsonable_encoder(await handle_webhook(webhook_request))
+        )
+        webhook_metrics.record_sizes(
+            webhook_request.fulfillmentInfo.tag,
+            len(await request.body()),
+            len(response.body),
+        )
+        return response
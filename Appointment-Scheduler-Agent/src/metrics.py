@@ -0,0 +1,255 @@
+import asyncio
+import glob
+import json
+import os
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+from src import config, logging
+from src.registry import Handler
+from src.schemas import WebhookRequest, WebhookResponse
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, Dialogflow gives up on a webhook after 5 s by default
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+class TagStats:
+    """Counters of one tag."""
+
+    __slots__ = (
+        "requests",
+        "errors",
+        "latency_sum",
+        "latency_buckets",
+        "sized",
+        "request_bytes",
+        "response_bytes",
+        # Last, snapshots written before it merge without it
+        "fallbacks",
+    )
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        # One count per bucket plus one for +Inf, not cumulative
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sized = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        # Requests the deadline middleware answered with the fallback
+        self.fallbacks = 0
+
+    def to_list(self) -> List[Any]:
+        return [getattr(self, name) for name in self.__slots__]
+
+    def merge(self, values: List[Any]) -> None:
+        """Add the counters of another worker, as to_list gave them."""
+        for name, value in zip(self.__slots__, values):
+            if name == "latency_buckets":
+                if len(value) == len(self.latency_buckets):
+                    self.latency_buckets = [
+                        own + other for own, other in zip(self.latency_buckets, value)
+                    ]
+            else:
+                setattr(self, name, getattr(self, name) + value)
+
+
+class WebhookMetrics:
+    """
+    Per-tag request counts by outcome, latency histograms, errors and
+    payload sizes.
+
+    A worker serves every request on one event loop thread, so the counters
+    are plain attributes updated without locks or atomics.
+
+    With a directory, like prometheus_client's multiprocess mode, every
+    worker writes a snapshot of its counters there each flush_interval
+    seconds and a scrape answered by any worker adds up the snapshots of
+    all of them. Snapshots of workers that exited are kept, so the counters
+    never go down. The directory must be emptied before the workers start,
+    see clear_directory.
+    """
+
+    def __init__(
+        self, directory: Optional[str] = None, flush_interval: float = 1.0
+    ) -> None:
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._tags: Dict[str, TagStats] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def open(self) -> None:
+        """Start writing snapshots, called from the app lifespan."""
+        if self.directory is None or self._flush_task is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._flush_task = asyncio.create_task(self._flush())
+
+    async def close(self) -> None:
+        """Write the last snapshot, called from the app lifespan."""
+        if self._flush_task is None:
+            return
+        self._flush_task.cancel()
+        self._flush_task = None
+        self._write()
+
+    async def _flush(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self._write()
+
+    def _snapshot(self) -> str:
+        return json.dumps({tag: stats.to_list() for tag, stats in self._tags.items()})
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"worker-{pid}.json")
+
+    def _write(self) -> None:
+        # A few kilobytes written on the loop, so the cancelled flush task can
+        # never be halfway through a write. Written aside and renamed, a
+        # scrape never reads half a snapshot.
+        path = self._path(os.getpid())
+        try:
+            with open(f"{path}.tmp", "w") as file:
+                file.write(self._snapshot())
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.error(f"Error writing the metrics snapshot: {e}")
+
+    def _collect(self) -> Dict[str, TagStats]:
+        """The counters of this worker plus the snapshots of all the others."""
+        if self.directory is None:
+            return self._tags
+
+        own = self._path(os.getpid())
+        tags: Dict[str, TagStats] = {}
+        for tag, stats in self._tags.items():
+            tags[tag] = TagStats()
+            tags[tag].merge(stats.to_list())
+        for path in glob.glob(os.path.join(self.directory, "worker-*.json")):
+            if path == own:
+                continue
+            try:
+                with open(path) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error reading the metrics snapshot {path}: {e}")
+                continue
+            for tag, values in snapshot.items():
+                stats = tags.get(tag)
+                if stats is None:
+                    stats = tags[tag] = TagStats()
+                stats.merge(values)
+        return tags
+
+    def _stats(self, tag: str) -> TagStats:
+        stats = self._tags.get(tag)
+        if stats is None:
+            stats = self._tags[tag] = TagStats()
+        return stats
+
+    async def middleware(
+        self, tag: str, webhook_request: WebhookRequest, call_next: Handler
+    ) -> WebhookResponse:
+        """Registry middleware recording the count, latency and errors of a tag."""
+        started = time.perf_counter()
+        try:
+            return await call_next(webhook_request)
+        except Exception:
+            self._stats(tag).errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = self._stats(tag)
+            stats.requests += 1
+            stats.latency_sum += elapsed
+            stats.latency_buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def record_fallback(self, tag: str) -> None:
+        """Count a request the deadline middleware answered with the fallback."""
+        self._stats(tag).fallbacks += 1
+
+    def record_sizes(self, tag: str, request_bytes: int, response_bytes: int) -> None:
+        """Record the body sizes of a request handled by the middleware."""
+        stats = self._tags.get(tag)
+        # Unknown tags never reach the middleware and get no series
+        if stats is None:
+            return
+        stats.sized += 1
+        stats.request_bytes += request_bytes
+        stats.response_bytes += response_bytes
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        tags = sorted(self._collect().items())
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def labels(tag: str, **extra: str) -> str:
+            pairs = {"tag": tag, **extra}
+            return ",".join(f'{key}="{_escape(value)}"' for key, value in pairs.items())
+
+        name = "webhook_requests_total"
+        family(name, "counter", "Webhook requests per tag and outcome.")
+        for tag, stats in tags:
+            # A fallback answered in time is neither a success nor an error
+            for outcome, count in (
+                ("success", stats.requests - stats.errors - stats.fallbacks),
+                ("error", stats.errors),
+                ("fallback", stats.fallbacks),
+            ):
+                lines.append(f"{name}{{{labels(tag, outcome=outcome)}}} {count}")
+
+        family("webhook_errors_total", "counter", "Webhook handlers that raised.")
+        for tag, stats in tags:
+            lines.append(f"webhook_errors_total{{{labels(tag)}}} {stats.errors}")
+
+        name = "webhook_request_duration_seconds"
+        family(name, "histogram", "Time spent in the webhook handler.")
+        for tag, stats in tags:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.latency_buckets):
+                cumulative += count
+                lines.append(
+                    f"{name}_bucket{{{labels(tag, le=repr(bound))}}} {cumulative}"
+                )
+            lines.append(f"{name}_bucket{{{labels(tag, le='+Inf')}}} {stats.requests}")
+            lines.append(f"{name}_sum{{{labels(tag)}}} {stats.latency_sum!r}")
+            lines.append(f"{name}_count{{{labels(tag)}}} {stats.requests}")
+
+        for name, attribute, help_text in (
+            ("webhook_request_size_bytes", "request_bytes", "Request body sizes."),
+            ("webhook_response_size_bytes", "response_bytes", "Response body sizes."),
+        ):
+            family(name, "summary", help_text)
+            for tag, stats in tags:
+                total = getattr(stats, attribute)
+                lines.append(f"{name}_sum{{{labels(tag)}}} {total}")
+                lines.append(f"{name}_count{{{labels(tag)}}} {stats.sized}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def clear_directory(directory: str) -> None:
+    """Remove the snapshots of a previous run, before the workers start."""
+    for path in glob.glob(os.path.join(directory, "worker-*.json*")):
+        os.remove(path)
+
+
+webhook_metrics = WebhookMetrics(
+    directory=config.METRICS_DIR or None,
+    flush_interval=config.METRICS_FLUSH_SECONDS,
+)
@@ -0,0 +1,239 @@
+"""
+In-process replay of webhook requests against an ASGI app.
+
+The requests are sent straight to the app callable, no server and no
+network, from a number of concurrent workers. Used by benchmarks/replay.py,
+which sets up the app and its fake backends.
+
+Every request sent gets its own detectIntentResponseId, like a new turn of
+a conversation, so none of them is answered as a retry of an earlier one.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+Corpus = List[Tuple[str, bytes]]
+
+# Numbers the requests of every replay in the process
+_sent = itertools.count()
+
+
+def load_corpus(path: str) -> Corpus:
+    """
+    Read webhook requests from a JSON file holding a list of requests, or
+    from a directory of JSON files holding one request each.
+
+    Returns:
+        (tag, raw body) of every request
+    """
+    if os.path.isdir(path):
+        requests = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".json"):
+                with open(os.path.join(path, name), "r") as file:
+                    requests.append(json.load(file))
+    else:
+        with open(path, "r") as file:
+            requests = json.load(file)
+
+    return [
+        (request["fulfillmentInfo"]["tag"], json.dumps(request).encode("utf-8"))
+        for request in requests
+    ]
+
+
+def with_response_id(body: bytes) -> bytes:
+    """Prefix the detectIntentResponseId of a corpus request with a new number."""
+    return body.replace(
+        b'"detectIntentResponseId": "',
+        b'"detectIntentResponseId": "%d-' % next(_sent),
+        1,
+    )
+
+
+async def post(app: Any, path: str, body: bytes, api_key: str) -> Tuple[int, bytes]:
+    """Send one POST request to an ASGI app and collect the response."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"replay"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"x-api-key", api_key.encode("ascii")),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("replay", 80),
+    }
+    received = False
+    status = 0
+    chunks: List[bytes] = []
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal received
+        if received:
+            # The app only asks again to watch for a disconnect
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def replay(
+    app: Any, corpus: Corpus, requests: int, concurrency: int, api_key: str
+) -> Dict[str, Any]:
+    """
+    Send requests from the corpus, round robin, from concurrent workers.
+
+    Args:
+        app: The ASGI app, with its lifespan already running
+        corpus: The requests to replay
+        requests: Total number of requests sent
+        concurrency: Number of requests in flight at a time
+        api_key: Value of the X-API-Key header
+
+    Returns:
+        Throughput of the whole run and latency percentiles per tag
+    """
+    latencies: Dict[str, List[float]] = {tag: [] for tag, _ in corpus}
+    errors: Dict[str, int] = {tag: 0 for tag, _ in corpus}
+    next_request = 0
+
+    async def worker() -> None:
+        nonlocal next_request
+        while next_request < requests:
+            tag, body = corpus[next_request % len(corpus)]
+            body = with_response_id(body)
+            next_request += 1
+
+            started = time.perf_counter()
+            status, _ = await post(app, "/webhook", body, api_key)
+            latencies[tag].append(time.perf_counter() - started)
+            if status != 200:
+                errors[tag] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    tags = {}
+    for tag, samples in sorted(latencies.items()):
+        ordered = sorted(samples)
+        tags[tag] = {
+            "requests": len(ordered),
+            "errors": errors[tag],
+            "mean_ms": sum(ordered) / len(ordered) * 1000,
+            "p50_ms": percentile(ordered, 0.50) * 1000,
+            "p95_ms": percentile(ordered, 0.95) * 1000,
+            "p99_ms": percentile(ordered, 0.99) * 1000,
+        }
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed,
+        "errors": sum(errors.values()),
+        "tags": tags,
+    }
+
+
+async def measure_allocations(
+    app: Any, corpus: Corpus, rounds: int, api_key: str
+) -> Dict[str, Dict[str, float]]:
+    """
+    Memory allocated per request and tag, traced with tracemalloc.
+
+    Tracing slows every allocation down, so this runs one request at a time
+    after the timed replay.
+
+    Returns:
+        Mean peak and retained bytes per request of every tag
+    """
+    peaks: Dict[str, List[int]] = {tag: [] for tag, _ in corpus}
+    retained: Dict[str, List[int]] = {tag: [] for tag, _ in corpus}
+
+    tracemalloc.start()
+    try:
+        for _ in range(rounds):
+            for tag, body in corpus:
+                body = with_response_id(body)
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                await post(app, "/webhook", body, api_key)
+                current, peak = tracemalloc.get_traced_memory()
+                peaks[tag].append(peak - before)
+                retained[tag].append(current - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        tag: {
+            "alloc_peak_bytes": sum(peaks[tag]) / len(peaks[tag]),
+            "alloc_retained_bytes": sum(retained[tag]) / len(retained[tag]),
+        }
+        for tag in sorted(peaks)
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Commit and interpreter the results were measured with."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    run = results["replay"]
+    print(
+        f"{run['requests']} requests, concurrency {run['concurrency']}: "
+        f"{run['throughput_rps']:.0f} req/s, {run['errors']} errors"
+    )
+    print(
+        f"{'tag':<28}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'alloc KiB':>11}"
+    )
+    for tag, stats in run["tags"].items():
+        allocations = results["allocations"].get(tag, {})
+        peak = allocations.get("alloc_peak_bytes", 0) / 1024
+        print(
+            f"{tag:<28}{stats['requests']:>9}{stats['errors']:>8}"
+            f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+            f"{peak:>11.1f}"
+        )
@@ -0,0 +1,44 @@
+import os
+import statistics
+from typing import Dict, List
+
+from src.database import database
+
+# Menu shipped with the agent, used to seed the benchmark databases
+FOOD_ITEMS_JSON = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "food_items.json"
+)
+
+
+async def use_temp_database(tmp_dir: str, profile: str = database.DB_PROFILE) -> str:
+    """
+    Point the database module at a fresh SQLite file seeded with the menu.
+
+    Args:
+        tmp_dir: Directory the database file is created in
+        profile: Storage profile the connections are opened with
+
+    Returns:
+        The path of the new database file
+    """
+    db_path = os.path.join(tmp_dir, "food_database.db")
+    database.use_database(db_path, profile=profile)
+
+    await database.create_tables()
+    await database.add_items_from_json(FOOD_ITEMS_JSON)
+    return db_path
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Mean and percentiles in ms of a list of durations in seconds."""
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+    return {
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
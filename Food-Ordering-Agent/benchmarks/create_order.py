@@ -0,0 +1,103 @@
+"""
+Latency of create_order by cart size, before and after batching.
+
+The "before" variant mirrors the old per-line implementation, one SELECT and
+one INSERT per cart line, on the same pooled writer connection. "after"
+prices every line from the catalog, "snapshot" passes a cart priced at the
+current menu version, whose prices are taken as they are. All variants take
+their order numbers from the same sequence.
+
+Run from the Food-Ordering-Agent directory:
+
+    python -m benchmarks.create_order
+"""
+
+import argparse
+import asyncio
+import datetime
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import summarize, use_temp_database
+from src.database import database
+
+
+async def create_order_per_line(items: List[Dict[str, Any]]) -> int:
+    new_order_number = await database.order_numbers.next_value()
+
+    async with database.pool.writer() as db:
+        total_amount = 0
+        order_items = []
+        for item_entry in items:
+            cursor = await db.execute(
+                "SELECT id, price FROM items WHERE item_name = ? COLLATE NOCASE",
+                (item_entry["item_name"],),
+            )
+            item = await cursor.fetchone()
+            total_amount += item["price"] * item_entry["quantity"]
+            order_items.append({"item_id": item["id"], "quantity": item_entry["quantity"]})
+
+        cursor = await db.execute(
+            "INSERT INTO orders (order_number, amount, created_at) VALUES (?, ?, ?)",
+            (new_order_number, total_amount, datetime.datetime.now().isoformat()),
+        )
+        order_id = cursor.lastrowid
+        for order_item in order_items:
+            await db.execute(
+                "INSERT INTO order_items (order_id, item_id, quantity) VALUES (?, ?, ?)",
+                (order_id, order_item["item_id"], order_item["quantity"]),
+            )
+
+        await db.commit()
+        return new_order_number
+
+
+async def run(cart_sizes: List[int], iterations: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        await use_temp_database(tmp_dir)
+        catalog = await database.get_catalog()
+        names = [item["item_name"] for item in catalog.items]
+
+        print(f"{'lines':>6} {'variant':>10} {'mean_ms':>9} {'p50_ms':>9} {'p95_ms':>9}")
+        for size in cart_sizes:
+            cart = [
+                {"item_name": names[i % len(names)], "quantity": 1 + i % 3}
+                for i in range(size)
+            ]
+            snapshot = [
+                dict(line, price=item["price"], item_id=item["id"])
+                for line, item in zip(
+                    cart, (catalog.get(line["item_name"]) for line in cart)
+                )
+            ]
+
+            async def create_from_snapshot(_: List[Dict[str, Any]]) -> int:
+                return await database.create_order(snapshot, catalog.version)
+
+            for variant, create in (
+                ("before", create_order_per_line),
+                ("after", database.create_order),
+                ("snapshot", create_from_snapshot),
+            ):
+                samples = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    await create(cart)
+                    samples.append(time.perf_counter() - started)
+                stats = summarize(samples)
+                print(
+                    f"{size:>6} {variant:>10} {stats['mean_ms']:>9.3f} "
+                    f"{stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f}"
+                )
+
+        await database.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 30, 50, 100])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(run(cart_sizes=args.sizes, iterations=args.iterations))
@@ -0,0 +1,214 @@
+"""
+Latency of a WhatsApp message's detect intent call, new client against shared client.
+
+A local gRPC server stands in for Dialogflow and answers DetectIntent right
+away, so only the client side of a message is timed, through
+detect_intent_async:
+
+    per message   service account credentials, a new channel and client and
+                  the call, what every message did before the client was
+                  shared
+    shared        the call on the one client of the worker
+
+With --tls the stand-in serves a self-signed certificate, made with the
+cryptography package, and every new channel also pays for a TLS handshake
+like it does against Dialogflow. The OAuth token fetch of new credentials,
+one more round trip to Google per message before, is in neither number.
+
+Run from the Food-Ordering-Agent directory:
+
+    python -m benchmarks.detect_intent --messages 200 --tls
+"""
+
+import os
+
+# Offline defaults, the stand-in is the only server called
+os.environ.setdefault("WARM_UP", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import datetime  # noqa: E402
+import time  # noqa: E402
+from typing import Any, Dict, List, Optional, Tuple  # noqa: E402
+
+import grpc  # noqa: E402
+from google.cloud import dialogflowcx_v3 as dialogflow  # noqa: E402
+from google.oauth2 import service_account  # noqa: E402
+
+from benchmarks.common import summarize  # noqa: E402
+from src import detect_intent  # noqa: E402
+
+RESPONSE = dialogflow.DetectIntentResponse(
+    query_result=dialogflow.QueryResult(
+        response_messages=[
+            dialogflow.ResponseMessage(
+                text=dialogflow.ResponseMessage.Text(text=["Welcome to the shop."])
+            )
+        ]
+    )
+)
+
+
+def private_key_pem() -> str:
+    """A new RSA key, with whichever library google-auth signs with."""
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+    except ImportError:
+        import rsa as python_rsa
+
+        return python_rsa.newkeys(2048)[1].save_pkcs1().decode()
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def service_account_info() -> Dict[str, Any]:
+    """A service account with a fresh key, never used to fetch a token."""
+    return {
+        "type": "service_account",
+        "project_id": "stand-in",
+        "private_key_id": "stand-in",
+        "private_key": private_key_pem(),
+        "client_email": "stand-in@stand-in.iam.gserviceaccount.com",
+        "client_id": "0",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }
+
+
+def self_signed_certificate() -> Tuple[bytes, bytes]:
+    """Key and certificate for localhost, in PEM."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False
+        )
+        .sign(key, hashes.SHA256())
+    )
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return key_pem, certificate.public_bytes(serialization.Encoding.PEM)
+
+
+async def start_stand_in(
+    certificate: Optional[Tuple[bytes, bytes]],
+) -> Tuple[grpc.aio.Server, str]:
+    """Start the Dialogflow stand-in, returns the server and its address."""
+
+    async def detect(request: dialogflow.DetectIntentRequest, context: Any):
+        return RESPONSE
+
+    handler = grpc.method_handlers_generic_handler(
+        "google.cloud.dialogflow.cx.v3.Sessions",
+        {
+            "DetectIntent": grpc.unary_unary_rpc_method_handler(
+                detect,
+                request_deserializer=dialogflow.DetectIntentRequest.deserialize,
+                response_serializer=dialogflow.DetectIntentResponse.serialize,
+            )
+        },
+    )
+    server = grpc.aio.server()
+    server.add_generic_rpc_handlers((handler,))
+    if certificate is None:
+        port = server.add_insecure_port("localhost:0")
+    else:
+        port = server.add_secure_port(
+            "localhost:0", grpc.ssl_server_credentials([certificate])
+        )
+    await server.start()
+    return server, f"localhost:{port}"
+
+
+def open_channel(address: str, certificate: Optional[Tuple[bytes, bytes]]):
+    if certificate is None:
+        return grpc.aio.insecure_channel(address, options=detect_intent.CHANNEL_OPTIONS)
+    return grpc.aio.secure_channel(
+        address,
+        grpc.ssl_channel_credentials(root_certificates=certificate[1]),
+        options=detect_intent.CHANNEL_OPTIONS,
+    )
+
+
+async def time_messages(messages: int) -> List[float]:
+    samples = []
+    for number in range(messages):
+        started = time.perf_counter()
+        response = await detect_intent.detect_intent_async(
+            session_id=f"whatsapp:+1555000{number % 100:04d}", text_input="hi"
+        )
+        samples.append(time.perf_counter() - started)
+        if not response["status"]:
+            raise RuntimeError("The stand-in did not answer")
+    return samples
+
+
+async def run(messages: int, tls: bool) -> None:
+    certificate = self_signed_certificate() if tls else None
+    info = service_account_info()
+    server, address = await start_stand_in(certificate)
+
+    # What every message did before, the channels were never closed either
+    opened = []
+
+    def new_client():
+        service_account.Credentials.from_service_account_info(info)
+        opened.append(detect_intent.create_client(open_channel(address, certificate)))
+        return opened[-1]
+
+    shared = detect_intent.create_client(open_channel(address, certificate))
+
+    results = {}
+    try:
+        for variant, get_client in (
+            ("per message", new_client),
+            ("shared", lambda: shared),
+        ):
+            detect_intent.get_client = get_client
+            await time_messages(5)
+            results[variant] = summarize(await time_messages(messages))
+    finally:
+        for client in [*opened, shared]:
+            await client.transport.close()
+        await server.stop(None)
+
+    print(f"{messages} messages, {'TLS' if tls else 'plaintext'} stand-in")
+    print(f"{'variant':>12} {'mean_ms':>9} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}")
+    for variant, stats in results.items():
+        print(
+            f"{variant:>12} {stats['mean_ms']:>9.3f} {stats['p50_ms']:>9.3f} "
+            f"{stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f}"
+        )
+    saving = results["per message"]["mean_ms"] - results["shared"]["mean_ms"]
+    print(f"Saving per message: {saving:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--tls", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(run(messages=args.messages, tls=args.tls))
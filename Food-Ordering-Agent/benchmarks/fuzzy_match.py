@@ -0,0 +1,213 @@
+"""
+Fuzzy item matching over a large synthetic catalog.
+
+Builds the trigram index for a catalog of made-up dish names, then times
+lookups of misspelled names and an incremental rebuild after a menu change.
+Every name has one or two common dish words plus two brand or variant words
+from a generated vocabulary, like a multi-brand menu.
+
+The answers of --check lookups, misspelled names of the real menu and
+near-tie cases are compared with a brute-force scan of every name, the
+benchmark fails on the first disagreement.
+
+Run from the Food-Ordering-Agent directory:
+
+    python -m benchmarks.fuzzy_match --names 50000
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.common import summarize
+from src.database.catalog import Catalog, normalize_name
+from src.database.fuzzy import trigrams
+
+WORDS = [
+    "paneer", "tikka", "masala", "butter", "chicken", "jeera", "rice", "dal",
+    "makhani", "biryani", "naan", "garlic", "kadai", "chole", "rajma", "aloo",
+    "gobi", "palak", "mutter", "korma", "vindaloo", "pulao", "tandoori", "kofta",
+]
+
+
+ONSETS = [
+    "b", "bh", "ch", "d", "dh", "f", "g", "gh", "h", "j", "k", "kh", "l", "m",
+    "n", "p", "ph", "r", "s", "sh", "t", "th", "v", "w", "y", "z", "br", "kr",
+    "pr", "st", "tr", "gr", "bl", "cl", "sp", "qu",
+]
+VOWELS = ["a", "e", "i", "o", "u", "aa", "ee", "oo", "ai", "au", "ou", "ie", "y"]
+CODAS = ["", "", "", "n", "r", "l", "m", "s", "t", "x", "ck", "ng"]
+
+
+def make_vocabulary(rng: random.Random, size: int) -> List[str]:
+    words = set()
+    while len(words) < size:
+        words.add(
+            "".join(
+                rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS)
+                for _ in range(rng.randint(2, 3))
+            )
+        )
+    return sorted(words)
+
+
+def make_name(rng: random.Random, vocabulary: List[str]) -> str:
+    words = rng.sample(WORDS, rng.randint(1, 2)) + rng.sample(vocabulary, 2)
+    return " ".join(words)
+
+
+def misspell(rng: random.Random, name: str) -> str:
+    chars = list(name)
+    for _ in range(2):
+        i = rng.randrange(len(chars))
+        if chars[i] == " ":
+            continue
+        if rng.random() < 0.5:
+            del chars[i]
+        else:
+            chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+
+def make_items(rng: random.Random, count: int) -> List[dict]:
+    vocabulary = make_vocabulary(rng, 3000)
+    names = set()
+    while len(names) < count:
+        names.add(make_name(rng, vocabulary))
+    return [
+        {"id": i, "item_name": name, "price": 100, "synonyms": []}
+        for i, name in enumerate(sorted(names))
+    ]
+
+
+class FullScan:
+    """Scores a query against every name and synonym, the answer to check."""
+
+    def __init__(self, items: List[dict]) -> None:
+        keys: Dict[str, int] = {}
+        for item in items:
+            for name in [item["item_name"], *item["synonyms"]]:
+                keys.setdefault(normalize_name(name), item["id"])
+        self.keys = [(key, trigrams(key), item_id) for key, item_id in keys.items()]
+
+    def get_closest(self, query: str, threshold: float, margin: float) -> Optional[int]:
+        query_grams = trigrams(normalize_name(query))
+        scored = []
+        for key, grams, item_id in self.keys:
+            shared = len(query_grams & grams)
+            score = shared / (len(query_grams) + len(grams) - shared)
+            if score >= threshold:
+                scored.append((score, key, item_id))
+        if not scored:
+            return None
+
+        scored.sort(key=lambda entry: (-entry[0], entry[1]))
+        best_score, _, best_id = scored[0]
+        for score, _, item_id in scored[1:]:
+            if best_score - score > margin:
+                break
+            if item_id != best_id:
+                return None
+        return best_id
+
+
+def check(
+    items: List[dict], queries: List[str], threshold: float, margin: float
+) -> None:
+    """Fail on the first query the index and a full scan answer differently."""
+    catalog, scan = Catalog(items), FullScan(items)
+    for query in queries:
+        match = catalog.get_closest(query, threshold=threshold, margin=margin)
+        found = None if match is None else match["id"]
+        expected = scan.get_closest(query, threshold, margin)
+        if found != expected:
+            raise RuntimeError(
+                f"{query!r} matched item {found}, a full scan finds {expected}"
+            )
+
+
+def check_menu(rng: random.Random, threshold: float, margin: float) -> int:
+    """Misspelled names of the real menu and near ties, checked against a scan."""
+    with open("food_items.json") as file:
+        menu = [
+            {"id": i, "item_name": item["item_name"], "synonyms": item["synonyms"]}
+            for i, item in enumerate(json.load(file))
+        ]
+    queries = [
+        misspell(rng, name)
+        for _ in range(20)
+        for item in menu
+        for name in [item["item_name"], *item["synonyms"]]
+    ]
+    check(menu, queries, threshold, margin)
+
+    # The runner-up scores within the margin but below the best match
+    near_tie = [
+        {"id": 0, "item_name": "tikka fyl", "synonyms": []},
+        {"id": 1, "item_name": "tikka fylkq", "synonyms": []},
+    ]
+    check(near_tie, ["tikka fylk"], threshold, margin)
+    return len(queries) + 1
+
+
+def main(
+    names: int, queries: int, checked: int, threshold: float, margin: float
+) -> None:
+    rng = random.Random(7)
+    items = make_items(rng, names)
+
+    started = time.perf_counter()
+    catalog = Catalog(items)
+    print(f"build: {len(catalog)} names in {time.perf_counter() - started:.2f} s")
+
+    samples = []
+    found = 0
+    for _ in range(queries):
+        target = rng.choice(items)
+        query = misspell(rng, target["item_name"])
+        started = time.perf_counter()
+        match = catalog.get_closest(query, threshold=threshold, margin=margin)
+        samples.append(time.perf_counter() - started)
+        if match is not None and match["id"] == target["id"]:
+            found += 1
+
+    stats = summarize(samples)
+    print(
+        f"lookup: p50 {stats['p50_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms, "
+        f"correct {found}/{queries}"
+    )
+
+    started = time.perf_counter()
+    check(
+        items,
+        [misspell(rng, rng.choice(items)["item_name"]) for _ in range(checked)],
+        threshold,
+        margin,
+    )
+    menu_checked = check_menu(rng, threshold, margin)
+    print(
+        f"full scan agrees: {checked} synthetic and {menu_checked} menu lookups "
+        f"in {time.perf_counter() - started:.1f} s"
+    )
+
+    # Menu change: 1% of the items replaced by new ones
+    changed = items[len(items) // 100 :] + make_items(random.Random(8), len(items) // 100)
+    for i, item in enumerate(changed):
+        item["id"] = i
+    started = time.perf_counter()
+    Catalog(changed, fuzzy_index=catalog.fuzzy_index)
+    print(f"incremental rebuild: {time.perf_counter() - started:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--names", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--check", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=0.45)
+    parser.add_argument("--margin", type=float, default=0.12)
+    args = parser.parse_args()
+
+    main(args.names, args.queries, args.check, args.threshold, args.margin)
@@ -0,0 +1,84 @@
+"""
+Order confirmation throughput with and without group commit.
+
+A max batch of 1 commits every order on its own, like before group commit.
+wait_ms is the average time a batch waited for the writer connection and
+commit_ms the average time it then took to write and commit.
+
+Run from the Food-Ordering-Agent directory:
+
+    python -m benchmarks.group_commit
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import List
+
+from benchmarks.common import summarize, use_temp_database
+from src.database import database
+from src.database.order_writer import OrderWriter
+
+
+async def run_batch_size(
+    max_batch: int, orders: int, concurrency: int, profile: str
+) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        await use_temp_database(tmp_dir, profile=profile)
+        database.order_writer = OrderWriter(database.pool, max_batch=max_batch)
+        catalog = await database.get_catalog()
+        cart = [{"item_name": item["item_name"], "quantity": 1} for item in catalog.items[:3]]
+
+        samples: List[float] = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def confirm() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                await database.create_order(items=cart)
+                samples.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(confirm() for _ in range(orders)))
+        elapsed = time.perf_counter() - started
+
+        writer_stats = database.order_writer.stats()
+        await database.close_pool()
+
+    stats = summarize(samples)
+    print(
+        f"{max_batch:>9} {orders / elapsed:>9.0f} {writer_stats['batch_size_avg']:>9.1f} "
+        f"{stats['p50_ms']:>9.3f} {stats['p99_ms']:>9.3f} "
+        f"{writer_stats['wait_avg_ms']:>9.3f} {writer_stats['commit_avg_ms']:>9.3f}"
+    )
+
+
+async def run(
+    batch_sizes: List[int], orders: int, concurrency: int, profile: str
+) -> None:
+    print(f"profile: {profile}, concurrency: {concurrency}")
+    print(
+        f"{'max_batch':>9} {'orders/s':>9} {'avg_batch':>9} {'p50_ms':>9} "
+        f"{'p99_ms':>9} {'wait_ms':>9} {'commit_ms':>9}"
+    )
+    for max_batch in batch_sizes:
+        await run_batch_size(max_batch, orders, concurrency, profile)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--orders", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--profile", default=database.DB_PROFILE)
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(
+            args.batch_sizes,
+            args.orders,
+            args.concurrency,
+            args.profile,
+        )
+    )
@@ -0,0 +1,96 @@
+"""
+Import time of the webhook app, the cold start before the first request.
+
+src.main is imported in fresh interpreters: a few times to time the whole
+import, then once with -X importtime to list the slowest modules. With
+--budget-ms the command exits with status 1 when the median import takes
+longer, so it can run as a CI step.
+
+Run from the directory of the app:
+
+    python -m benchmarks.import_time --top 15 --budget-ms 1500
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import List, Tuple
+
+TIMED_IMPORT = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def time_import(module: str) -> float:
+    """Seconds a fresh interpreter takes to import the module."""
+    result = subprocess.run(
+        [sys.executable, "-c", TIMED_IMPORT.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def profile_import(module: str) -> List[Tuple[str, int, int]]:
+    """
+    Import the module with -X importtime.
+
+    Returns:
+        (module, self us, cumulative us) of every module imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        modules.append((name.strip(), int(own), int(cumulative)))
+    return modules
+
+
+def run(module: str, runs: int, top: int, budget_ms: float | None) -> int:
+    timings = [time_import(module) * 1000 for _ in range(runs)]
+    median = statistics.median(timings)
+    print(
+        f"import {module}: median {median:.0f} ms, min {min(timings):.0f} ms, "
+        f"max {max(timings):.0f} ms over {runs} runs"
+    )
+
+    modules = profile_import(module)
+    top_level = sorted(
+        (entry for entry in modules if "." not in entry[0]),
+        key=lambda entry: entry[2],
+        reverse=True,
+    )
+    print("\nslowest top level packages, cumulative")
+    for name, _, cumulative in top_level[:top]:
+        print(f"{cumulative / 1000:>9.1f} ms  {name}")
+
+    print("\nslowest modules, own time")
+    by_own_time = sorted(modules, key=lambda entry: entry[1], reverse=True)
+    for name, own, _ in by_own_time[:top]:
+        print(f"{own / 1000:>9.1f} ms  {name}")
+
+    if budget_ms is not None and median > budget_ms:
+        print(f"\nImport takes {median:.0f} ms, over the budget of {budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    sys.exit(run(args.module, args.runs, args.top, args.budget_ms))
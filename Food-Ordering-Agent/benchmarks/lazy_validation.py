@@ -0,0 +1,149 @@
+"""
+Request validation cost, full WebhookRequest against LazyWebhookRequest.
+
+Every payload looks like a Dialogflow turn late in an order: the messages of
+the turn, a page form with its parameters and the session parameters with
+the order cart. Timed per request:
+
+    full         WebhookRequest.model_validate_json
+    lazy         load_lazy_webhook_request, orjson and LazyWebhookRequest
+    lazy+read    lazy, then the tag and the session parameters, what the
+                 food handlers read
+    lazy+all     lazy, then every lazily validated section
+
+Run from the Food-Ordering-Agent directory:
+
+    python -m benchmarks.lazy_validation
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from src.fast_json import load_lazy_webhook_request
+from src.schemas import WebhookRequest
+
+ITEMS = [
+    ("Jeera Rice", 120.0), ("Veg Pulao", 150.0), ("Biryani", 220.0),
+    ("Paneer Butter Masala", 180.0), ("Dal Makhani", 150.0),
+    ("Butter Naan", 40.0), ("Garlic Naan", 50.0), ("Butter Chicken", 220.0),
+]
+
+
+def make_payload(tag: str, cart_lines: int, form_parameters: int) -> bytes:
+    session = "projects/p/locations/global/agents/a/sessions/7c1e2d3f4a5b"
+    page = f"{session}/flows/00000000-0000-0000-0000-000000000000/pages/order"
+    order_cart = []
+    for i in range(cart_lines):
+        name, price = ITEMS[i % len(ITEMS)]
+        order_cart.append({"food_item": name, "quantity": 1 + i % 3, "price": price})
+    parameter_info = [
+        {
+            "displayName": f"parameter_{i}",
+            "required": True,
+            "state": "FILLED",
+            "value": f"value {i}",
+            "justCollected": i == 0,
+        }
+        for i in range(form_parameters)
+    ]
+    payload: Dict[str, Any] = {
+        "detectIntentResponseId": "5f1a7b0e-3c9d-4e2a-9b7c-1d2e3f4a5b6c",
+        "languageCode": "en",
+        "fulfillmentInfo": {"tag": tag},
+        "intentInfo": {"displayName": "order.add", "confidence": 0.93},
+        "pageInfo": {
+            "currentPage": page,
+            "displayName": "Order",
+            "formInfo": {"parameterInfo": parameter_info},
+        },
+        "sessionInfo": {
+            "session": session,
+            "parameters": {
+                "food_item": "Butter Naan",
+                "quantity": 2,
+                "order_cart": order_cart,
+            },
+        },
+        "messages": [
+            {
+                "text": {"text": ["Sure, what would you like to order?"]},
+                "responseType": "ENTRY_PROMPT",
+                "source": "VIRTUAL_AGENT",
+            },
+            {
+                "text": {"text": ["How many would you like?"]},
+                "responseType": "PARAMETER_PROMPT",
+                "source": "VIRTUAL_AGENT",
+            },
+        ],
+        "text": "two butter naan please",
+    }
+    return json.dumps(payload).encode("utf-8")
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> float:
+    """Mean time of one call in microseconds."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def read_handler_fields(body: bytes) -> None:
+    webhook_request = load_lazy_webhook_request(body)
+    webhook_request.fulfillmentInfo.tag
+    webhook_request.sessionInfo.parameters["order_cart"]
+
+
+def read_all_fields(body: bytes) -> None:
+    webhook_request = load_lazy_webhook_request(body)
+    webhook_request.intentInfo
+    webhook_request.pageInfo
+    webhook_request.messages
+
+
+def main(repeat: int) -> None:
+    payloads = {
+        "small cart": make_payload("checkItemAvailabilty", 2, 2),
+        "10 line cart": make_payload("showSummary", 10, 4),
+        "100 line cart": make_payload("showSummary", 100, 4),
+        "100 line cart, big form": make_payload("confirmOrder", 100, 30),
+    }
+
+    rows: List[Dict[str, Any]] = []
+    for name, body in payloads.items():
+        assert WebhookRequest.model_validate_json(body).pageInfo is not None
+        full = time_call(lambda: WebhookRequest.model_validate_json(body), repeat)
+        lazy = time_call(lambda: load_lazy_webhook_request(body), repeat)
+        rows.append(
+            {
+                "payload": name,
+                "bytes": len(body),
+                "full": full,
+                "lazy": lazy,
+                "lazy_read": time_call(lambda: read_handler_fields(body), repeat),
+                "lazy_all": time_call(lambda: read_all_fields(body), repeat),
+            }
+        )
+
+    print(
+        f"{'payload':<26}{'bytes':>7}{'full':>10}{'lazy':>10}"
+        f"{'lazy+read':>12}{'lazy+all':>11}{'saved':>8}"
+    )
+    for row in rows:
+        saved = 1 - row["lazy_read"] / row["full"]
+        print(
+            f"{row['payload']:<26}{row['bytes']:>7}"
+            f"{row['full']:>8.1f}us{row['lazy']:>8.1f}us"
+            f"{row['lazy_read']:>10.1f}us{row['lazy_all']:>9.1f}us{saved:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    main(args.repeat)
@@ -0,0 +1,65 @@
+"""
+Import a large synthetic menu and report throughput and peak memory.
+
+Run from the Food-Ordering-Agent directory:
+
+    python -m benchmarks.menu_import --items 50000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import use_temp_database
+from src.database import database
+
+
+def write_menu(path: str, items: int) -> None:
+    with open(path, "w") as file:
+        file.write("[\n")
+        for i in range(items):
+            item = {
+                "item_name": f"Dish {i}",
+                "ingredients": ["rice", "spices", f"ingredient {i % 97}"],
+                "quantity": "250 grams",
+                "price": 100 + i % 400,
+                "spicy_level": "medium",
+                "synonyms": [f"dish {i}", f"brand {i % 13} dish {i}"],
+            }
+            file.write(("," if i else "") + json.dumps(item) + "\n")
+        file.write("]\n")
+
+
+async def run(items: int, chunk_size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        await use_temp_database(tmp_dir)
+        menu_path = os.path.join(tmp_dir, "menu.json")
+        write_menu(menu_path, items)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        imported = await database.add_items_from_json(
+            menu_path, chunk_size=chunk_size, progress=lambda _: None
+        )
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        await database.close_pool()
+
+    print(f"file: {items} items, imported: {imported}")
+    print(f"throughput: {imported / elapsed:.0f} items/s")
+    print(f"peak traced memory: {peak / 1024 / 1024:.1f} MiB (includes the catalog)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(run(items=args.items, chunk_size=args.chunk_size))
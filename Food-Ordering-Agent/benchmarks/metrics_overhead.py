@@ -0,0 +1,92 @@
+"""
+Cost of the per-tag metrics on a webhook dispatch.
+
+A handler returning a prebuilt response is dispatched through a registry
+with and without the metrics middleware, the difference is what the
+metrics add to every request. Recording the payload sizes and rendering
+/metrics are timed on their own.
+
+Run from the Food-Ordering-Agent directory:
+
+    python -m benchmarks.metrics_overhead
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.metrics import WebhookMetrics
+from src.registry import HandlerRegistry
+from src.schemas import (
+    FulfillmentResponse,
+    Message,
+    Text,
+    WebhookRequest,
+    WebhookResponse,
+)
+
+RESPONSE = WebhookResponse(
+    fulfillmentResponse=FulfillmentResponse(
+        messages=[Message(text=Text(text=["It is added to you cart."]))]
+    )
+)
+
+
+async def handler(webhook_request: WebhookRequest) -> WebhookResponse:
+    return RESPONSE
+
+
+async def time_dispatch(registry: HandlerRegistry, repeat: int) -> float:
+    """Mean time of one dispatch in microseconds."""
+    webhook_request = WebhookRequest.model_validate(
+        {
+            "detectIntentResponseId": "d",
+            "languageCode": "en",
+            "text": "two naan",
+            "fulfillmentInfo": {"tag": "checkItemAvailabilty"},
+            "sessionInfo": {"session": "s", "parameters": {}},
+        }
+    )
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await registry.dispatch(webhook_request)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def run(repeat: int) -> None:
+    plain = HandlerRegistry()
+    plain.register("checkItemAvailabilty", handler)
+
+    metrics = WebhookMetrics()
+    measured = HandlerRegistry()
+    measured.use(metrics.middleware)
+    measured.register("checkItemAvailabilty", handler)
+
+    # Warm up both paths before timing
+    await time_dispatch(plain, 1000)
+    await time_dispatch(measured, 1000)
+    without = min([await time_dispatch(plain, repeat) for _ in range(5)])
+    with_metrics = min([await time_dispatch(measured, repeat) for _ in range(5)])
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        metrics.record_sizes("checkItemAvailabilty", 1143, 918)
+    record_sizes = (time.perf_counter() - started) / repeat * 1e6
+
+    started = time.perf_counter()
+    rendered = metrics.render()
+    render = (time.perf_counter() - started) * 1e6
+
+    print(f"dispatch without metrics: {without:.2f} us")
+    print(f"dispatch with metrics:    {with_metrics:.2f} us")
+    print(f"middleware overhead:      {with_metrics - without:.2f} us")
+    print(f"record_sizes:             {record_sizes:.2f} us")
+    print(f"render /metrics:          {render:.0f} us, {len(rendered)} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=100000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.repeat))
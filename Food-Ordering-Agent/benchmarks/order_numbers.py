@@ -0,0 +1,82 @@
+"""
+Concurrent order confirmations from several worker processes on one database.
+
+Every process runs its own pool and order number sequence, like separate
+uvicorn workers, and fires create_order from many coroutines at once. The
+run fails if any order number is handed out twice.
+
+Run from the Food-Ordering-Agent directory:
+
+    python -m benchmarks.order_numbers
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+from typing import List
+
+from benchmarks.common import use_temp_database
+from src.database import database
+
+
+async def confirm_orders(db_path: str, orders: int, concurrency: int) -> List[int]:
+    database.use_database(db_path)
+    catalog = await database.get_catalog()
+    cart = [{"item_name": item["item_name"], "quantity": 1} for item in catalog.items[:3]]
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def confirm() -> int:
+        async with semaphore:
+            return await database.create_order(items=cart)
+
+    order_numbers = await asyncio.gather(*(confirm() for _ in range(orders)))
+    await database.close_pool()
+    return order_numbers
+
+
+def worker(db_path: str, orders: int, concurrency: int) -> List[int]:
+    return asyncio.run(confirm_orders(db_path, orders, concurrency))
+
+
+async def seed(tmp_dir: str) -> str:
+    db_path = await use_temp_database(tmp_dir)
+    await database.close_pool()
+    return db_path
+
+
+def main(workers: int, orders: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = asyncio.run(seed(tmp_dir))
+
+        started = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(workers) as process_pool:
+            results = process_pool.starmap(
+                worker, [(db_path, orders, concurrency)] * workers
+            )
+        elapsed = time.perf_counter() - started
+
+        order_numbers = [n for result in results for n in result]
+        with sqlite3.connect(db_path) as db:
+            stored = db.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    total = workers * orders
+    print(f"workers: {workers}, orders: {total}, stored: {stored}")
+    print(f"unique order numbers: {len(set(order_numbers))}")
+    print(f"throughput: {total / elapsed:.0f} orders/s")
+
+    if len(set(order_numbers)) != total or stored != total:
+        raise SystemExit("duplicate or missing orders")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--orders", type=int, default=500, help="orders per worker")
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    main(workers=args.workers, orders=args.orders, concurrency=args.concurrency)
@@ -0,0 +1,100 @@
+"""
+Replay a corpus of webhook requests against the food ordering app.
+
+src.main:app runs in process with its lifespan on a temporary database
+seeded with the menu, so neither Dialogflow nor Twilio is needed. Reports
+throughput, latency percentiles and memory allocated per request for every
+tag, and writes the results as JSON to compare commits.
+
+Run from the Food-Ordering-Agent directory:
+
+    python -m benchmarks.replay --requests 5000 --concurrency 32 --output replay.json
+"""
+
+import os
+
+# Offline defaults, the replay never calls Google or Twilio
+os.environ.setdefault("X_API_KEY", "replay")
+os.environ.setdefault("WARM_UP", "false")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+import tempfile  # noqa: E402
+
+from benchmarks.asgi_replay import (  # noqa: E402
+    environment,
+    load_corpus,
+    measure_allocations,
+    print_results,
+    replay,
+)
+from benchmarks.common import use_temp_database  # noqa: E402
+from src import config  # noqa: E402
+from src.database import database  # noqa: E402
+from src.main import app  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replay_corpus.json")
+
+
+async def run(
+    corpus_path: str,
+    requests: int,
+    concurrency: int,
+    allocation_rounds: int,
+    output: str | None,
+) -> None:
+    corpus = load_corpus(corpus_path)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        await use_temp_database(tmp_dir)
+        # The orderStatus requests of the corpus look up order number 1
+        await database.create_order(
+            items=[{"item_name": "Butter Naan", "quantity": 2}]
+        )
+
+        async with app.router.lifespan_context(app):
+            # Warm up the caches and the order number block first
+            await replay(app, corpus, len(corpus), 1, config.X_API_KEY)
+            results = {
+                "app": "Food-Ordering-Agent",
+                "corpus": os.path.abspath(corpus_path),
+                "environment": environment(),
+                "replay": await replay(
+                    app, corpus, requests, concurrency, config.X_API_KEY
+                ),
+                "allocations": await measure_allocations(
+                    app, corpus, allocation_rounds, config.X_API_KEY
+                ),
+            }
+
+    print_results(results)
+    if output:
+        with open(output, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--allocation-rounds", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    # Handler logs would dominate the measurement
+    logging.getLogger().setLevel(args.log_level)
+
+    asyncio.run(
+        run(
+            args.corpus,
+            args.requests,
+            args.concurrency,
+            args.allocation_rounds,
+            args.output,
+        )
+    )
@@ -0,0 +1,99 @@
+"""
+Mixed read/write load against every storage profile.
+
+Many coroutines run 90% item lookups and 10% order confirmations against a
+fresh database per profile. fetch_item_by_name is served from the in-memory
+catalog, so the lookups here run the indexed name query on a pooled reader
+connection to measure the storage layer itself.
+
+Run from the Food-Ordering-Agent directory:
+
+    python -m benchmarks.storage_profiles
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.common import summarize, use_temp_database
+from src.database import database
+from src.database.pool import STORAGE_PROFILES
+
+
+async def lookup_item(item_name: str) -> None:
+    async with database.pool.reader() as db:
+        cursor = await db.execute(
+            "SELECT * FROM items WHERE item_name = ? COLLATE NOCASE", (item_name,)
+        )
+        await cursor.fetchone()
+        await cursor.close()
+
+
+async def run_profile(
+    profile: str, operations: int, concurrency: int, write_ratio: float
+) -> Dict[str, Dict[str, float]]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        await use_temp_database(tmp_dir, profile=profile)
+        catalog = await database.get_catalog()
+        names = [item["item_name"] for item in catalog.items]
+
+        rng = random.Random(42)
+        plan = [rng.random() < write_ratio for _ in range(operations)]
+        samples: Dict[str, List[float]] = {"lookup": [], "confirm": []}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def operation(is_write: bool) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                if is_write:
+                    cart = [
+                        {"item_name": rng.choice(names), "quantity": 1}
+                        for _ in range(3)
+                    ]
+                    await database.create_order(items=cart)
+                    samples["confirm"].append(time.perf_counter() - started)
+                else:
+                    await lookup_item(rng.choice(names))
+                    samples["lookup"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(operation(is_write) for is_write in plan))
+        elapsed = time.perf_counter() - started
+
+        await database.close_pool()
+
+    results = {kind: summarize(values) for kind, values in samples.items() if values}
+    results["total"] = {"ops_per_s": operations / elapsed}
+    return results
+
+
+async def run(
+    profiles: List[str], operations: int, concurrency: int, write_ratio: float
+) -> None:
+    print(
+        f"{'profile':>10} {'ops/s':>9} {'lookup_p50':>11} {'lookup_p99':>11} "
+        f"{'confirm_p50':>12} {'confirm_p99':>12}"
+    )
+    for profile in profiles:
+        results = await run_profile(profile, operations, concurrency, write_ratio)
+        print(
+            f"{profile:>10} {results['total']['ops_per_s']:>9.0f} "
+            f"{results['lookup']['p50_ms']:>11.3f} {results['lookup']['p99_ms']:>11.3f} "
+            f"{results['confirm']['p50_ms']:>12.3f} {results['confirm']['p99_ms']:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", nargs="+", default=list(STORAGE_PROFILES))
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(args.profiles, args.operations, args.concurrency, args.write_ratio)
+    )
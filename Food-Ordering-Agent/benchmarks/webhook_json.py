@@ -0,0 +1,164 @@
+"""
+Webhook JSON cost per tag, default FastAPI path against the fast path.
+
+For every tag a Dialogflow request is run through its handler once, then
+request parsing and response serialization are timed on their own:
+
+    parse dict    json.loads and WebhookRequest.model_validate, like FastAPI
+    parse bytes   WebhookRequest.model_validate_json on the raw body
+    encode model  response_model validation and the stdlib json encoder
+    encode fast   encode_webhook_response, no validation and no defaults
+    encode orjson orjson.dumps of the dumped model, only if orjson is installed
+
+Run from the Food-Ordering-Agent directory:
+
+    python -m benchmarks.webhook_json --cart-lines 10
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import use_temp_database
+from src.database import database
+from src.fast_json import encode_webhook_response
+from src.registry import registry
+from src.schemas import WebhookRequest, WebhookResponse
+from src.actions import (  # noqa: F401
+    check_item_availability,
+    show_temp_summary,
+    remove_item,
+    show_summary,
+    confirm_order,
+    order_status,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def make_request(tag: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    session = "projects/p/locations/global/agents/a/sessions/benchmark"
+    return {
+        "detectIntentResponseId": "5f1a7b0e-3c9d-4e2a-9b7c-1d2e3f4a5b6c",
+        "languageCode": "en",
+        "fulfillmentInfo": {"tag": tag},
+        "intentInfo": {"displayName": "order.add", "confidence": 0.93},
+        "pageInfo": {
+            "currentPage": f"{session}/flows/f/pages/p",
+            "displayName": "Order",
+        },
+        "sessionInfo": {"session": session, "parameters": parameters},
+        "text": "two chicken biryani please",
+    }
+
+
+def encode_model(response: WebhookResponse) -> bytes:
+    """What response_model and JSONResponse do with a returned model."""
+    value = WebhookResponse.model_validate(response.model_dump(by_alias=True))
+    return json.dumps(
+        value.model_dump(mode="json", by_alias=True),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> float:
+    """Mean time of one call in microseconds."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def build_requests(cart_lines: int) -> Dict[str, Dict[str, Any]]:
+    catalog = await database.get_catalog()
+    items = [catalog.items[i % len(catalog.items)] for i in range(cart_lines)]
+    order_cart = [
+        {"food_item": item["item_name"], "quantity": 2, "price": item["price"]}
+        for item in items
+    ]
+    order_number = await database.create_order(
+        items=[{"item_name": item["item_name"], "quantity": 2} for item in items]
+    )
+
+    first = items[0]["item_name"]
+    return {
+        "checkItemAvailabilty": make_request(
+            "checkItemAvailabilty",
+            {"food_item": first, "quantity": 1, "order_cart": order_cart},
+        ),
+        "showTempSummary": make_request("showTempSummary", {"order_cart": order_cart}),
+        "removeItem": make_request(
+            "removeItem", {"food_item": first, "quantity": 1, "order_cart": order_cart}
+        ),
+        "showSummary": make_request("showSummary", {"order_cart": order_cart}),
+        "confirmOrder": make_request("confirmOrder", {"order_cart": order_cart}),
+        "orderStatus": make_request("orderStatus", {"order_number": order_number}),
+    }
+
+
+async def run(cart_lines: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        await use_temp_database(tmp_dir)
+        await database.load_catalog()
+        requests = await build_requests(cart_lines)
+
+        rows: List[Dict[str, Any]] = []
+        for tag, request in requests.items():
+            body = json.dumps(request).encode("utf-8")
+            response = await registry.dispatch(WebhookRequest.model_validate_json(body))
+
+            row = {
+                "tag": tag,
+                "request_bytes": len(body),
+                "parse_dict_us": time_call(
+                    lambda: WebhookRequest.model_validate(json.loads(body)), repeat
+                ),
+                "parse_bytes_us": time_call(
+                    lambda: WebhookRequest.model_validate_json(body), repeat
+                ),
+                "encode_model_us": time_call(lambda: encode_model(response), repeat),
+                "encode_fast_us": time_call(
+                    lambda: encode_webhook_response(response), repeat
+                ),
+                "model_bytes": len(encode_model(response)),
+                "fast_bytes": len(encode_webhook_response(response)),
+            }
+            if orjson is not None:
+                row["encode_orjson_us"] = time_call(
+                    lambda: orjson.dumps(response.model_dump(exclude_defaults=True)),
+                    repeat,
+                )
+            rows.append(row)
+
+        await database.close_pool()
+
+    print(
+        f"{'tag':<22}{'req B':>7}{'parse dict':>12}{'parse bytes':>13}"
+        f"{'enc model':>11}{'enc fast':>10}{'enc orjson':>12}{'resp B':>8}{'fast B':>8}"
+    )
+    for row in rows:
+        orjson_us = row.get("encode_orjson_us")
+        print(
+            f"{row['tag']:<22}{row['request_bytes']:>7}"
+            f"{row['parse_dict_us']:>10.1f}us{row['parse_bytes_us']:>11.1f}us"
+            f"{row['encode_model_us']:>9.1f}us{row['encode_fast_us']:>8.1f}us"
+            f"{(f'{orjson_us:.1f}us' if orjson_us is not None else '-'):>12}"
+            f"{row['model_bytes']:>8}{row['fast_bytes']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cart-lines", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.cart_lines, args.repeat))
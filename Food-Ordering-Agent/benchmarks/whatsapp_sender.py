@@ -0,0 +1,204 @@
+"""
+WhatsApp replies through a fake Twilio endpoint, blocking client against pooled sender.
+
+A local aiohttp server on its own thread and event loop stands in for the
+Twilio Messages API, it checks the credentials and form fields, answers
+every message after --latency-ms and records the order messages arrive in
+per recipient. Every one of --recipients customers gets --replies messages
+at the same moment, like the /whatsapp webhook sending the replies of one
+inbound message each:
+
+    blocking   a requests session posting one message at a time on the
+               event loop, what the synchronous twilio client did
+    pooled     WhatsAppSender, one keep-alive session and at most
+               --concurrency messages in flight
+
+Both variants must deliver the replies of every recipient in order, the
+pooled one must also never exceed its concurrency. Run from the
+Food-Ordering-Agent directory:
+
+    python -m benchmarks.whatsapp_sender --recipients 50 --replies 3 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import base64
+import threading
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import requests
+from aiohttp import web
+
+from benchmarks.common import summarize
+from src.whatsapp import WhatsAppSender
+
+ACCOUNT_SID = "AC00000000000000000000000000000000"
+AUTH_TOKEN = "fake-token"
+FROM = "whatsapp:+14155238886"
+
+
+class FakeTwilio:
+    """Records the messages it is sent and how many were in flight at most."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.received: Dict[str, List[str]] = defaultdict(list)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._runner = None
+        self.url = ""
+
+    async def messages(self, request: web.Request) -> web.Response:
+        expected = base64.b64encode(f"{ACCOUNT_SID}:{AUTH_TOKEN}".encode()).decode()
+        if request.headers.get("Authorization") != f"Basic {expected}":
+            return error(401, 20003, "Authenticate")
+        if request.match_info["sid"] != ACCOUNT_SID:
+            return error(404, 20404, "The requested resource was not found")
+        form = await request.post()
+        if form.get("From") != FROM or not form.get("To") or not form.get("Body"):
+            return error(400, 21602, "Message body is required")
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        self.received[form["To"]].append(form["Body"])
+        sid = f"SM{sum(map(len, self.received.values())):032x}"
+        return web.json_response({"sid": sid, "status": "queued"}, status=201)
+
+    def start(self) -> None:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/2010-04-01/Accounts/{sid}/Messages.json", self.messages)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+
+    def reset(self) -> None:
+        self.received.clear()
+        self.max_in_flight = 0
+
+
+def error(status: int, code: int, message: str) -> web.Response:
+    """A Twilio error response."""
+    return web.json_response({"code": code, "message": message}, status=status)
+
+
+def blocking_sender(url: str) -> Tuple[Callable[..., Awaitable[None]], Callable]:
+    """The synchronous client the sender replaced, blocking the loop per message."""
+    session = requests.Session()
+    session.auth = (ACCOUNT_SID, AUTH_TOKEN)
+
+    async def send(to: str, *bodies: str) -> None:
+        for body in bodies:
+            response = session.post(
+                f"{url}/2010-04-01/Accounts/{ACCOUNT_SID}/Messages.json",
+                data={"From": FROM, "To": to, "Body": body},
+                timeout=10,
+            )
+            response.raise_for_status()
+
+    return send, session.close
+
+
+async def deliver(
+    send: Callable[..., Awaitable[None]], conversations: Dict[str, List[str]]
+) -> Tuple[float, List[float]]:
+    """Send every conversation at once, returns the total and per-recipient times."""
+
+    async def reply(to: str, bodies: List[str]) -> float:
+        started = time.perf_counter()
+        await send(to, *bodies)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(
+        *(reply(to, bodies) for to, bodies in conversations.items())
+    )
+    return time.perf_counter() - started, list(latencies)
+
+
+async def run(recipients: int, replies: int, latency: float, concurrency: int) -> None:
+    fake = FakeTwilio(latency)
+    fake.start()
+
+    conversations = {
+        f"whatsapp:+1555{number:07d}": [
+            f"Reply {reply} to customer {number}" for reply in range(replies)
+        ]
+        for number in range(recipients)
+    }
+    total_messages = recipients * replies
+
+    pooled = WhatsAppSender(
+        ACCOUNT_SID, AUTH_TOKEN, FROM, api_url=fake.url, max_concurrency=concurrency
+    )
+    blocking, close_blocking = blocking_sender(fake.url)
+
+    print(
+        f"{recipients} recipients x {replies} replies, Twilio latency "
+        f"{latency * 1000:.0f} ms, concurrency {concurrency}"
+    )
+    print(
+        f"{'variant':>9} {'total_s':>8} {'msg/s':>8} {'p50_ms':>9} {'p95_ms':>9} "
+        f"{'in_flight':>9} {'ordered':>8}"
+    )
+    try:
+        for variant, send in (("blocking", blocking), ("pooled", pooled.send)):
+            fake.reset()
+            total, latencies = await deliver(send, conversations)
+            stats = summarize(latencies)
+            ordered = dict(fake.received) == conversations
+            print(
+                f"{variant:>9} {total:>8.2f} {total_messages / total:>8.0f} "
+                f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+                f"{fake.max_in_flight:>9} {str(ordered):>8}"
+            )
+            if not ordered:
+                raise RuntimeError(f"{variant} delivered replies out of order")
+        if fake.max_in_flight > concurrency:
+            raise RuntimeError("The pooled sender exceeded its concurrency")
+
+        # Two send calls for one recipient at once, the batches must not mix
+        fake.reset()
+        to = "whatsapp:+15550000000"
+        first = [f"First {reply}" for reply in range(replies)]
+        second = [f"Second {reply}" for reply in range(replies)]
+        await asyncio.gather(pooled.send(to, *first), pooled.send(to, *second))
+        if fake.received[to] != first + second:
+            raise RuntimeError("Concurrent send calls for one recipient mixed")
+        print("Concurrent send calls for one recipient kept their order")
+    finally:
+        close_blocking()
+        await pooled.close()
+        fake.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipients", type=int, default=50)
+    parser.add_argument("--replies", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(args.recipients, args.replies, args.latency_ms / 1000, args.concurrency)
+    )
@@ -7,35 +7,48 @@ from src.schemas import (
     SessionInfo,
 )
 from src import logging
-from src.database.database import fetch_item_by_name
+from src.idempotency import webhook_idempotency
+from src.json_logging import log_sample
+from src.registry import registry
+from src.database.database import fetch_item_by_name, load_cart, save_cart
 
 logger = logging.getLogger(__name__)
 
 
+# The cart is kept server side, a retry must not add the item twice. No
+# fallback, a save cut off by the deadline still commits while the customer
+# would be told to try again
+@registry.handler("checkItemAvailabilty", middleware=[webhook_idempotency.middleware])
 async def check_item_availabilty(webhook_request: WebhookRequest) -> WebhookResponse:
     """TODO
     [1] extract the item from request
     [2] go to database find the item
     [3] found add the item
     [4] not found move to ask parameter page"""
-    food_item = webhook_request.sessionInfo.parameters["food_item"]
-    quantity = webhook_request.sessionInfo.parameters["quantity"]
+    session = webhook_request.sessionInfo.session
+    parameters = webhook_request.sessionInfo.parameters
+    food_item = parameters["food_item"]
+    quantity = parameters["quantity"]
 
-    order_cart = []
-    if "order_cart" in webhook_request.sessionInfo.parameters.keys():
-        order_cart = webhook_request.sessionInfo.parameters["order_cart"]
-
-    logger.info(food_item)
-    logger.info(quantity)
+    logger.debug("Item requested: %s x %s", food_item, quantity)
 
     db_item = await fetch_item_by_name(item_name=food_item)
 
     if db_item:
-        logger.info(db_item)
+        log_sample(logger, "Menu item found", db_item)
+
+        # The customer may have misspelled the item, use the menu name
+        food_item = db_item["item_name"]
 
-        order_cart.append(
-            {"food_item": food_item, "quantity": quantity, "price": db_item["price"]}
+        cart = await load_cart(session, parameters)
+        cart.add(
+            food_item,
+            quantity,
+            db_item["price"],
+            item_id=db_item["id"],
+            menu_version=db_item["menu_version"],
         )
+        changed = await save_cart(session, parameters, cart)
 
         return WebhookResponse(
             fulfillmentResponse=FulfillmentResponse(
@@ -50,8 +63,8 @@ async def check_item_availabilty(webhook_request: WebhookRequest) -> WebhookResp
                 ]
             ),
             sessionInfo=SessionInfo(
-                session=webhook_request.sessionInfo.session,
-                parameters={"order_cart": order_cart},
+                session=session,
+                parameters=changed,
             ),
         )
     else:
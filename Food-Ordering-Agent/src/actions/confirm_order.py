@@ -1,5 +1,3 @@
-from typing import List, Dict, Any
-
 from src.schemas import (
     FulfillmentResponse,
     Message,
@@ -8,27 +6,27 @@ from src.schemas import (
     Text,
 )
 from src import logging
-from src.database.database import create_order
+from src.json_logging import log_sample
+from src.idempotency import webhook_idempotency
+from src.registry import registry
+from src.database.database import create_order, load_cart
 
 logger = logging.getLogger(__name__)
 
 
+# Dialogflow retries a timed out call, a retry must not place a second order
+@registry.handler("confirmOrder", middleware=[webhook_idempotency.middleware])
 async def confirm_order(webhook_request: WebhookRequest) -> WebhookResponse:
     """TODO
     [1] extract the order_cart
     [2] create the order in database"""
-    order_cart: List[Dict[str, Any]] = webhook_request.sessionInfo.parameters[
-        "order_cart"
-    ]
-    logger.info(order_cart)
-
-    formatted_order_cart = []
-    for oc in order_cart:
-        formatted_order_cart.append(
-            {"item_name": oc["food_item"], "quantity": oc["quantity"]}
-        )
+    cart = await load_cart(
+        webhook_request.sessionInfo.session, webhook_request.sessionInfo.parameters
+    )
+    order_items = cart.order_items()
+    log_sample(logger, "Order cart", order_items)
 
-    order_number = await create_order(items=formatted_order_cart)
+    order_number = await create_order(items=order_items, menu_version=cart.menu_version)
 
     return WebhookResponse(
         fulfillmentResponse=FulfillmentResponse(
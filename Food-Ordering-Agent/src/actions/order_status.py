@@ -6,35 +6,34 @@ from src.schemas import (
     Text,
 )
 from src import logging
-from src.database.database import get_order_details
+from src.registry import registry
+from src.database.database import get_order_summary
 
 logger = logging.getLogger(__name__)
 
 
+@registry.handler(
+    "orderStatus",
+    fallback="Looking up your order is taking longer than expected, please try again.",
+)
 async def order_status(webhook_request: WebhookRequest) -> WebhookResponse:
     """TODO
     [1] extract the order_cart
     [2] create the order in database"""
     order_number = int(webhook_request.sessionInfo.parameters["order_number"])
 
-    db_order = await get_order_details(order_id=order_number)
+    db_order = await get_order_summary(order_number=order_number)
 
-    #     #     print(f"Order #{order['order_number']} details:")
-    #     #     print(f"Amount: {order['amount']}")
-    #     #     print(f"Created at: {order['created_at']}")
-    #     #     print("Items:")
-    #     #     for item in order["items"]:
-    #     #         print(f"- {item['quantity']}x {item['item_name']} (₹{item['price']} each)")
-    out_string = f"Order #{db_order['order_number']} details:\n"
-    out_string += f"Amount: {db_order['amount']}\n"
-    out_string += "Items:\n"
+    if db_order:
+        out_string = f"Order #{db_order['order_number']} details:\n"
+        out_string += f"Amount: {db_order['amount']}\n"
+        out_string += "Items:\n"
 
-    for item in db_order["items"]:
-        out_string += (
-            f"- {item['quantity']} x {item['item_name']} (₹{item['price']} each)"
-        )
+        for item in db_order["items"]:
+            out_string += (
+                f"- {item['quantity']} x {item['item_name']} (₹{item['price']} each)"
+            )
 
-    if order_number:
         return WebhookResponse(
             fulfillmentResponse=FulfillmentResponse(
                 messages=[
@@ -6,29 +6,36 @@ from src.schemas import (
     WebhookRequest,
     Text,
 )
+from src.database.database import fetch_item_by_name, load_cart, save_cart
+from src.idempotency import webhook_idempotency
+from src.registry import registry
 
 
+# The cart is kept server side, a retry must not remove the item twice. No
+# fallback, a save cut off by the deadline still commits while the customer
+# would be told to try again
+@registry.handler("removeItem", middleware=[webhook_idempotency.middleware])
 async def remove_item(webhook_request: WebhookRequest) -> WebhookResponse:
     """TODO:
     [1] extract the order_cart
     [2] remove the item
     [3] send the response back and replace the order_cart"""
 
-    order_cart = webhook_request.sessionInfo.parameters["order_cart"]
-    food_item = webhook_request.sessionInfo.parameters["food_item"]
-    quantity = webhook_request.sessionInfo.parameters["quantity"]
+    session = webhook_request.sessionInfo.session
+    parameters = webhook_request.sessionInfo.parameters
+    cart = await load_cart(session, parameters)
+    food_item = parameters["food_item"]
+    quantity = parameters["quantity"]
 
-    updated_order_cart = []
+    # The cart is keyed by the menu's spelling of the item, like it was added
+    db_item = await fetch_item_by_name(item_name=food_item)
+    if db_item and db_item["item_name"] in cart:
+        food_item = db_item["item_name"]
 
-    for oc in order_cart:
-        if oc["food_item"] == food_item:
-            oc["quantity"] = int(oc["quantity"]) - quantity
-        if int(oc["quantity"]) == 0:
-            pass
-        else:
-            updated_order_cart.append(oc)
+    removed = cart.remove(food_item, quantity)
+    changed = await save_cart(session, parameters, cart) if removed else {}
 
-    if len(updated_order_cart) == 0:
+    if len(cart) == 0:
         return WebhookResponse(
             fulfillmentResponse=FulfillmentResponse(
                 messages=[
@@ -42,25 +49,25 @@ async def remove_item(webhook_request: WebhookRequest) -> WebhookResponse:
                 ]
             ),
             sessionInfo=SessionInfo(
-                session=webhook_request.sessionInfo.session,
-                parameters={"order_cart": updated_order_cart},
+                session=session,
+                parameters=changed,
             ),
             targetPage="projects/youtube-dialogflow-cx/locations/global/agents/d23c3df0-06ff-4e38-9ea3-469630288825/flows/f16497c9-3464-4505-8c09-901acd20897d/pages/44a51e5a-d7e9-4df9-b49d-1c94e04ee468",
         )
     else:
+        if removed:
+            reply = f"We have removed {removed} number of {food_item}."
+        else:
+            reply = f"There is no {food_item} in your cart."
         return WebhookResponse(
             fulfillmentResponse=FulfillmentResponse(
                 messages=[
-                    Message(
-                        text=Text(
-                            text=[f"We have removed {quantity} number of {food_item}."]
-                        )
-                    ),
+                    Message(text=Text(text=[reply])),
                     Message(text=Text(text=["Do you want to remove another item?"])),
                 ]
             ),
             sessionInfo=SessionInfo(
-                session=webhook_request.sessionInfo.session,
-                parameters={"order_cart": updated_order_cart},
+                session=session,
+                parameters=changed,
             ),
         )
@@ -0,0 +1,167 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Session parameter the cart is kept in between turns
+CART_PARAMETER = "order_cart"
+
+
+class CartLine:
+    """Quantity, unit price and menu item id of one item in the cart."""
+
+    __slots__ = ("quantity", "price", "item_id")
+
+    def __init__(self, quantity: int, price: float, item_id: Optional[int]) -> None:
+        self.quantity = quantity
+        self.price = price
+        self.item_id = item_id
+
+
+class Cart:
+    """
+    Order cart keyed by item name, with running totals.
+
+    Adding or removing an item is a dict access and updates the totals in
+    place, nothing is rescanned. Quantities are parsed once, when the cart is
+    read from the session parameters. Two lines of the same item, as older
+    sessions may have, are merged on the way in.
+
+    menu_version is the oldest menu version any price in the cart was taken
+    from, None when that is not known. Up to that version every price is
+    known to be the menu price, see database.create_order.
+    """
+
+    __slots__ = ("_lines", "total", "quantity", "menu_version")
+
+    def __init__(self) -> None:
+        self._lines: Dict[str, CartLine] = {}
+        self.total = 0.0
+        self.quantity = 0
+        self.menu_version: Optional[int] = None
+
+    @classmethod
+    def from_lines(
+        cls, lines: Iterable[Dict[str, Any]], menu_version: Optional[int] = None
+    ) -> "Cart":
+        """Build a cart from food_item, quantity, price and item_id dictionaries."""
+        cart = cls()
+        for line in lines:
+            cart.add(
+                line["food_item"],
+                line["quantity"],
+                line["price"],
+                item_id=line.get("item_id"),
+                menu_version=menu_version,
+            )
+        return cart
+
+    @classmethod
+    def from_parameters(cls, parameters: Dict[str, Any]) -> "Cart":
+        """Read the cart from the session parameters, empty if there is none."""
+        return cls.from_lines(parameters.get(CART_PARAMETER) or ())
+
+    def lines(self) -> List[Dict[str, Any]]:
+        """The lines as food_item, quantity, price and item_id dictionaries."""
+        return [
+            {
+                "food_item": item,
+                "quantity": line.quantity,
+                "price": line.price,
+                "item_id": line.item_id,
+            }
+            for item, line in self._lines.items()
+        ]
+
+    def to_parameters(self) -> Dict[str, Any]:
+        """The session parameters holding the cart."""
+        return {CART_PARAMETER: self.lines()}
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._lines
+
+    def __iter__(self) -> Iterator[Tuple[str, int, float]]:
+        for item, line in self._lines.items():
+            yield item, line.quantity, line.price
+
+    def add(
+        self,
+        item: str,
+        quantity: Any,
+        price: float,
+        item_id: Optional[int] = None,
+        menu_version: Optional[int] = None,
+    ) -> None:
+        """
+        Add a quantity of an item, merged into its line if it has one.
+
+        Args:
+            item: The menu name of the item
+            quantity: The quantity to add
+            price: The unit price
+            item_id: The id of the menu item, if known
+            menu_version: The menu version the price was taken from, if known
+        """
+        if not self._lines:
+            self.menu_version = menu_version
+        elif self.menu_version is not None:
+            self.menu_version = (
+                None if menu_version is None else min(self.menu_version, menu_version)
+            )
+
+        quantity = int(quantity)
+        line = self._lines.get(item)
+        if line is None:
+            self._lines[item] = CartLine(quantity, price, item_id)
+        else:
+            # The price of the latest lookup wins for the whole line
+            self.total += line.quantity * (price - line.price)
+            line.quantity += quantity
+            line.price = price
+            line.item_id = item_id if item_id is not None else line.item_id
+        self.total += quantity * price
+        self.quantity += quantity
+
+    def remove(self, item: str, quantity: Any) -> int:
+        """
+        Remove up to a quantity of an item, the line goes once it is empty.
+
+        Returns:
+            The quantity actually removed, 0 if the item is not in the cart
+        """
+        line = self._lines.get(item)
+        if line is None:
+            return 0
+        removed = max(0, min(int(quantity), line.quantity))
+        line.quantity -= removed
+        if line.quantity <= 0:
+            del self._lines[item]
+        self.total -= removed * line.price
+        self.quantity -= removed
+        return removed
+
+    def summary_lines(self) -> List[str]:
+        """One "1. Jeera Rice X 2 = 240" line per item."""
+        return [
+            f"{number}. {item} X {line.quantity} = "
+            f"{format_amount(line.quantity * line.price)}"
+            for number, (item, line) in enumerate(self._lines.items(), start=1)
+        ]
+
+    def order_items(self) -> List[Dict[str, Any]]:
+        """The lines in the form database.create_order takes."""
+        return [
+            {
+                "item_name": item,
+                "quantity": line.quantity,
+                "price": line.price,
+                "item_id": line.item_id,
+            }
+            for item, line in self._lines.items()
+        ]
+
+
+def format_amount(amount: float) -> str:
+    """Amounts without a fraction are shown as whole numbers."""
+    amount = round(amount, 2)
+    return str(int(amount)) if amount == int(amount) else f"{amount:.2f}"
@@ -0,0 +1,205 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from src.cart import Cart
+from src.database.pool import ConnectionPool
+
+# Carts written by one upsert statement, four SQL variables each
+MAX_UPSERT_ROWS = 200
+
+# Session, serialized lines, menu version, expiry and the future of a save
+# waiting to be written
+PendingSave = Tuple[str, str, Optional[int], float, asyncio.Future]
+
+
+class CartStore:
+    """
+    Order carts by Dialogflow session, cached in memory and written through
+    to the carts table.
+
+    Every save bumps the version of the cart and the caller hands the version
+    to Dialogflow as a session parameter, so the next turn carries it back. A
+    worker answers from its cache only while the cached version is the one
+    the turn carries, otherwise another worker saved the cart since and it is
+    read from the database. Versions only ever go up for a session, a stale
+    cache entry can never match a newer turn.
+
+    Saves arriving while a write is in progress are committed together in
+    the next transaction with one upsert, the way OrderWriter groups orders,
+    so carts do not queue one commit at a time on the single writer.
+
+    Carts not saved for ttl seconds are gone, expired rows are deleted every
+    purge_every saves.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        max_size: int = 1024,
+        ttl: float = 3600.0,
+        purge_every: int = 1000,
+    ) -> None:
+        self.pool = pool
+        self.max_size = max_size
+        self.ttl = ttl
+        self.purge_every = purge_every
+
+        # session -> (version, expires_at, cart)
+        self._carts: "OrderedDict[str, Tuple[int, float, Cart]]" = OrderedDict()
+        # (session, lines, expires_at, future) waiting for the next write
+        self._pending: List[PendingSave] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._saves = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._carts)
+
+    async def get(self, session: str, version: Optional[int]) -> Cart:
+        """
+        The cart of a session, empty if it has none or it expired.
+
+        Args:
+            session: Dialogflow session path
+            version: Cart version the turn carries, None before the first save
+
+        The cart is shared with the cache, save it after changing it.
+        """
+        if version is None:
+            return Cart()
+
+        now = time.time()
+        entry = self._carts.get(session)
+        if entry is not None and entry[0] == version and entry[1] > now:
+            self._carts.move_to_end(session)
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+
+        async with self.pool.reader() as db:
+            rows = await db.execute_fetchall(
+                """
+                SELECT version, lines, menu_version, expires_at
+                FROM carts WHERE session = ?
+                """,
+                (session,),
+            )
+
+        row = rows[0] if rows else None
+        if row is None or row["expires_at"] <= now:
+            self._carts.pop(session, None)
+            return Cart()
+        cart = Cart.from_lines(json.loads(row["lines"]), row["menu_version"])
+        self._remember(session, row["version"], row["expires_at"], cart)
+        return cart
+
+    async def save(self, session: str, cart: Cart) -> int:
+        """
+        Write the cart of a session through to the database.
+
+        Returns:
+            The new version of the cart
+        """
+        expires_at = time.time() + self.ttl
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(
+            (session, json.dumps(cart.lines()), cart.menu_version, expires_at, future)
+        )
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush())
+        try:
+            version = await future
+        except BaseException:
+            # The cached cart may already hold the changes that were not saved
+            self._carts.pop(session, None)
+            raise
+
+        self._remember(session, version, expires_at, cart)
+        return version
+
+    async def close(self) -> None:
+        """Wait for the pending saves, called before the pool is closed."""
+        if self._flush_task is not None:
+            await self._flush_task
+            self._flush_task = None
+
+    async def _flush(self) -> None:
+        while self._pending:
+            batch, self._pending = self._pending, []
+            await self._write(batch)
+
+    async def _write(self, batch: List[PendingSave]) -> None:
+        saved: List[Tuple[asyncio.Future, int]] = []
+        try:
+            async with self.pool.writer() as db:
+                for chunk in _by_unique_session(batch):
+                    rows = await db.execute_fetchall(
+                        f"""
+                        INSERT INTO carts
+                        (session, version, lines, menu_version, expires_at)
+                        VALUES {', '.join(['(?, 1, ?, ?, ?)'] * len(chunk))}
+                        ON CONFLICT (session) DO UPDATE SET
+                            version = carts.version + 1,
+                            lines = excluded.lines,
+                            menu_version = excluded.menu_version,
+                            expires_at = excluded.expires_at
+                        RETURNING session, version
+                        """,
+                        [value for entry in chunk for value in entry[:4]],
+                    )
+                    versions = {row["session"]: row["version"] for row in rows}
+                    saved.extend((entry[4], versions[entry[0]]) for entry in chunk)
+
+                previous = self._saves
+                self._saves += len(batch)
+                if self._saves // self.purge_every > previous // self.purge_every:
+                    await db.execute(
+                        "DELETE FROM carts WHERE expires_at <= ?", (time.time(),)
+                    )
+                await db.commit()
+        except Exception as e:
+            # Nothing of this batch was committed
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, version in saved:
+            if not future.done():
+                future.set_result(version)
+
+    def _remember(
+        self, session: str, version: int, expires_at: float, cart: Cart
+    ) -> None:
+        self._carts[session] = (version, expires_at, cart)
+        self._carts.move_to_end(session)
+        if len(self._carts) > self.max_size:
+            self._carts.popitem(last=False)
+
+    def clear(self) -> None:
+        self._carts.clear()
+
+
+def _by_unique_session(batch: List[PendingSave]) -> List[List[PendingSave]]:
+    """
+    Split a batch so no session is twice in a chunk, one upsert updates a row
+    only once. Later saves of a session go to later chunks, in order. Chunks
+    hold at most MAX_UPSERT_ROWS carts to stay below SQLite's variable limit.
+    """
+    chunks: List[List[PendingSave]] = []
+    seen: List[set] = []
+    for entry in batch:
+        for chunk, sessions in zip(chunks, seen):
+            if entry[0] not in sessions and len(chunk) < MAX_UPSERT_ROWS:
+                break
+        else:
+            chunk, sessions = [], set()
+            chunks.append(chunk)
+            seen.append(sessions)
+        chunk.append(entry)
+        sessions.add(entry[0])
+    return chunks
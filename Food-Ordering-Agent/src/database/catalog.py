@@ -0,0 +1,103 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.database.fuzzy import TrigramIndex
+
+
+def normalize_name(name: str) -> str:
+    """Key used for every name and synonym lookup."""
+    return " ".join(name.split()).casefold()
+
+
+class Catalog:
+    """
+    Immutable in-memory snapshot of the items table.
+
+    Every item name and synonym is indexed in one hash map, so a lookup is a
+    single dict access. Item names always win over synonyms, and between two
+    synonyms the item with the lower id wins.
+
+    The same keys are also held in a trigram index for misspelled names. A
+    new catalog takes over the trigram index of the previous one and only
+    adds and removes the keys that changed.
+
+    version is the menu version the snapshot was loaded at, every item also
+    carries the price_version of the import that last changed its price.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[Dict[str, Any]],
+        fuzzy_index: Optional[TrigramIndex] = None,
+        version: int = 0,
+    ) -> None:
+        self.items: List[Dict[str, Any]] = sorted(items, key=lambda i: i["id"])
+        self.version = version
+        self._by_id: Dict[int, Dict[str, Any]] = {
+            item["id"]: item for item in self.items
+        }
+
+        index: Dict[str, Dict[str, Any]] = {}
+        for item in self.items:
+            index[normalize_name(item["item_name"])] = item
+        for item in self.items:
+            for synonym in item["synonyms"]:
+                index.setdefault(normalize_name(synonym), item)
+        self._index = index
+
+        self._fuzzy = fuzzy_index if fuzzy_index is not None else TrigramIndex()
+        for key in [key for key in self._fuzzy.keys() if key not in index]:
+            self._fuzzy.remove(key)
+        for key, item in index.items():
+            self._fuzzy.add(key, item)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def fuzzy_index(self) -> TrigramIndex:
+        return self._fuzzy
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Find an item by its name or one of its synonyms, case insensitive.
+
+        Args:
+            name: The item name or synonym
+
+        Returns:
+            A copy of the item dictionary or None if not found
+        """
+        item = self._index.get(normalize_name(name))
+        if item is None:
+            return None
+        return dict(item)
+
+    def get_by_id(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Find an item by its id.
+
+        Returns:
+            The item dictionary itself, not a copy, or None if not found
+        """
+        return self._by_id.get(item_id)
+
+    def get_closest(
+        self, name: str, threshold: float, margin: float = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find the item whose name or synonym is most similar to a misspelled name.
+
+        Args:
+            name: The misspelled item name
+            threshold: Minimum trigram similarity, between 0 and 1
+            margin: Another item scoring within this margin of the best one
+                makes the name ambiguous
+
+        Returns:
+            A copy of the item dictionary or None if nothing is similar enough
+            or the name is ambiguous
+        """
+        match = self._fuzzy.search(normalize_name(name), threshold, margin=margin)
+        if match is None:
+            return None
+        return dict(match[0])
@@ -1,20 +1,113 @@
-import aiosqlite
+import asyncio
 import json
-import datetime
 import os
-from typing import List, Dict, Any, Optional
-# import asyncio
+import time
+from typing import Callable, List, Dict, Any, Optional
+
+from src.cart import CART_PARAMETER, Cart
+from src.database.cache import LRUCache
+from src.database.cart_store import CartStore
+from src.database.catalog import Catalog
+from src.database.importer import iter_chunks, iter_json_array
+from src.database.migrations import migrate
+from src.database.order_writer import OrderWriter
+from src.database.pool import ConnectionPool
+from src.database.sequence import Sequence
 
 # Path to the database file
 DB_PATH = "food_database.db"
 
+# Number of reader connections kept open next to the single writer
+DB_POOL_READERS = int(os.getenv("DB_POOL_READERS", "4"))
+
+# Storage profile from pool.STORAGE_PROFILES, "rollback" or "wal"
+DB_PROFILE = os.getenv("DB_PROFILE", "wal")
+
+# Order numbers every worker reserves from the database at a time
+ORDER_NUMBER_BLOCK_SIZE = int(os.getenv("ORDER_NUMBER_BLOCK_SIZE", "100"))
+
+# Confirmed orders never change, so their summaries are cached by order number
+ORDER_CACHE_SIZE = int(os.getenv("ORDER_CACHE_SIZE", "1024"))
+
+# Orders confirmed while a write is in progress are committed together, up to
+# this many in one transaction
+ORDER_WRITER_MAX_BATCH = int(os.getenv("ORDER_WRITER_MAX_BATCH", "64"))
+
+# Carts of the most recently active sessions are kept in memory, a cart not
+# changed for CART_TTL_SECONDS is dropped
+CART_CACHE_SIZE = int(os.getenv("CART_CACHE_SIZE", "1024"))
+CART_TTL_SECONDS = float(os.getenv("CART_TTL_SECONDS", "3600"))
+
+# With CART_STORE=false the whole cart travels in the session parameters again
+CART_STORE = os.getenv("CART_STORE", "true").lower() == "true"
+
+# Session parameter carrying the version of the stored cart
+CART_VERSION_PARAMETER = "cart_version"
+
+# Menu imports run as their own script, every worker checks the menu version
+# at most this often and reloads its catalog when it changed. create_order
+# checks it on every order, it trusts the catalog prices.
+CATALOG_CHECK_SECONDS = float(os.getenv("CATALOG_CHECK_SECONDS", "1.0"))
+
+# Minimum trigram similarity for a misspelled item name to match an item, and
+# how far ahead of any other item the match has to be
+FUZZY_MATCH_THRESHOLD = float(os.getenv("FUZZY_MATCH_THRESHOLD", "0.45"))
+FUZZY_MATCH_MARGIN = float(os.getenv("FUZZY_MATCH_MARGIN", "0.12"))
+
+pool = ConnectionPool(DB_PATH, max_readers=DB_POOL_READERS, profile=DB_PROFILE)
+
+order_numbers = Sequence(pool, "order_number", block_size=ORDER_NUMBER_BLOCK_SIZE)
+
+order_cache = LRUCache(max_size=ORDER_CACHE_SIZE)
+
+order_writer = OrderWriter(pool, max_batch=ORDER_WRITER_MAX_BATCH)
+
+cart_store = CartStore(pool, max_size=CART_CACHE_SIZE, ttl=CART_TTL_SECONDS)
+
+# In-memory snapshot of the items table, see load_catalog
+_catalog: Optional[Catalog] = None
+# Monotonic time the menu version was last compared with the catalog
+_catalog_checked_at = 0.0
+# One reload at a time, an older snapshot never replaces a newer one
+_catalog_lock = asyncio.Lock()
+
+
+def use_database(db_path: str, profile: str = DB_PROFILE) -> None:
+    """
+    Point the module at another database file.
+
+    Args:
+        db_path: Path to the SQLite database file
+        profile: Storage profile the connections are opened with
+    """
+    global pool, order_numbers, order_writer, cart_store, _catalog, _catalog_lock
+    pool = ConnectionPool(db_path, max_readers=DB_POOL_READERS, profile=profile)
+    order_numbers = Sequence(pool, "order_number", block_size=ORDER_NUMBER_BLOCK_SIZE)
+    order_writer = OrderWriter(pool, max_batch=ORDER_WRITER_MAX_BATCH)
+    cart_store = CartStore(pool, max_size=CART_CACHE_SIZE, ttl=CART_TTL_SECONDS)
+    order_cache.clear()
+    _catalog = None
+    _catalog_lock = asyncio.Lock()
+
+
+async def open_pool() -> None:
+    """Open the long-lived connections, called from the app lifespan."""
+    await pool.open()
+
+
+async def close_pool() -> None:
+    """Close the long-lived connections, called from the app lifespan."""
+    await order_writer.close()
+    await cart_store.close()
+    await pool.close()
+
 
 # Function to create the database
 async def create_database() -> None:
     """Create the SQLite database file if it doesn't exist."""
     try:
         # Simply opening a connection will create the file if it doesn't exist
-        async with aiosqlite.connect(DB_PATH) as db:
+        async with pool.writer() as db:
             print(db)
             print(f"Database created or already exists at: {DB_PATH}")
     except Exception as e:
@@ -24,272 +117,431 @@ async def create_database() -> None:
 
 # Function to create tables
 async def create_tables() -> None:
-    """Create the necessary tables in the database."""
+    """Create the necessary tables and indexes by applying all migrations."""
     try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            # Create items table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    item_name TEXT UNIQUE NOT NULL,
-                    ingredients TEXT NOT NULL,
-                    quantity TEXT NOT NULL,
-                    price REAL NOT NULL,
-                    spicy_level TEXT NOT NULL,
-                    synonyms TEXT NOT NULL
-                )
-            """)
-
-            # Create orders table
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS orders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    order_number INTEGER UNIQUE NOT NULL,
-                    amount REAL NOT NULL,
-                    created_at TIMESTAMP NOT NULL
-                )
-            """)
-
-            # Create order_items junction table for many-to-many relationship
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS order_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    order_id INTEGER NOT NULL,
-                    item_id INTEGER NOT NULL,
-                    quantity INTEGER NOT NULL,
-                    FOREIGN KEY (order_id) REFERENCES orders (id),
-                    FOREIGN KEY (item_id) REFERENCES items (id)
-                )
-            """)
-
-            await db.commit()
-            print("Tables created successfully")
+        version = await migrate(pool)
+        print(f"Tables created successfully, schema version {version}")
     except Exception as e:
         print(f"Error creating tables: {e}")
         raise
 
 
-# Function to fetch an item by name
-async def fetch_item_by_name(item_name: str) -> Optional[Dict[str, Any]]:
+# Function to load the menu catalog
+async def load_catalog() -> Catalog:
     """
-    Fetch an item by its name.
-
-    Args:
-        item_name: The name of the item to fetch
+    Load the items table into a new in-memory catalog and swap it in.
 
     Returns:
-        A dictionary with the item details or None if not found
+        The freshly loaded catalog
     """
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            db.row_factory = aiosqlite.Row
+    async with _catalog_lock:
+        return await _load_catalog()
+
 
-            # Check for exact match first
+async def _load_catalog() -> Catalog:
+    global _catalog, _catalog_checked_at
+    try:
+        checked_at = time.monotonic()
+        async with pool.reader() as db:
+            # One statement, the items and the menu version are read together
             cursor = await db.execute(
-                "SELECT * FROM items WHERE item_name = ? COLLATE NOCASE", (item_name,)
+                """
+                SELECT items.*,
+                    (SELECT value FROM sequences WHERE name = 'menu_version')
+                    AS menu_version
+                FROM items
+                """
             )
-            item = await cursor.fetchone()
-
-            # If no exact match, try to match with synonyms
-            if item is None:
+            rows = await cursor.fetchall()
+            if not rows:
                 cursor = await db.execute(
-                    "SELECT * FROM items WHERE synonyms LIKE ?", (f"%{item_name}%",)
+                    "SELECT value FROM sequences WHERE name = 'menu_version'"
                 )
-                item = await cursor.fetchone()
-
-            if item:
-                item_dict = dict(item)
-                # Convert the stored JSON strings back to lists
-                item_dict["ingredients"] = json.loads(item_dict["ingredients"])
-                item_dict["synonyms"] = json.loads(item_dict["synonyms"])
-                return item_dict
-
-            return None
+                row = await cursor.fetchone()
+            await cursor.close()
+
+        version = rows[0]["menu_version"] if rows else row["value"] if row else 0
+        items = []
+        for row in rows:
+            item_dict = dict(row)
+            del item_dict["menu_version"]
+            # Convert the stored JSON strings back to lists
+            item_dict["ingredients"] = json.loads(item_dict["ingredients"])
+            item_dict["synonyms"] = json.loads(item_dict["synonyms"])
+            items.append(item_dict)
+
+        # A single assignment, readers see either the old or the new catalog
+        previous = _catalog
+        _catalog = Catalog(
+            items,
+            fuzzy_index=previous.fuzzy_index if previous is not None else None,
+            version=version,
+        )
+        _catalog_checked_at = checked_at
+        return _catalog
     except Exception as e:
-        print(f"Error fetching item: {e}")
+        print(f"Error loading catalog: {e}")
         raise
 
 
-# Function to create a new order
-async def create_order(items: List[Dict[str, Any]]) -> int:
+async def get_catalog(max_age: float = CATALOG_CHECK_SECONDS) -> Catalog:
     """
-    Create a new order with the provided items.
+    Return the current catalog, loading it on first use.
+
+    Args:
+        max_age: Seconds the menu version may go unchecked, once they are up
+            the catalog is reloaded if another process imported a menu
+    """
+    global _catalog_checked_at
+    if _catalog is None:
+        return await load_catalog()
+    checked_at = time.monotonic()
+    if checked_at - _catalog_checked_at < max_age:
+        return _catalog
+
+    # Set before the read, concurrent callers keep using the catalog meanwhile
+    _catalog_checked_at = checked_at
+    async with pool.reader() as db:
+        rows = await db.execute_fetchall(
+            "SELECT value FROM sequences WHERE name = 'menu_version'"
+        )
+    version = rows[0]["value"] if rows else 0
+    if version == _catalog.version:
+        return _catalog
+    async with _catalog_lock:
+        # Another caller may have reloaded it while this one waited
+        if _catalog.version == version:
+            return _catalog
+        print(f"Menu version {version}, reloading the catalog")
+        return await _load_catalog()
+
+
+# Function to fetch an item by name
+async def fetch_item_by_name(item_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch an item by its name or one of its synonyms, falling back to the
+    closest match for misspelled names.
 
     Args:
-        items: A list of dictionaries with keys 'item_name' and 'quantity'
+        item_name: The name of the item to fetch
 
     Returns:
-        The order number of the created order
+        A dictionary with the item details and the menu_version of the
+        catalog it was found in, or None if not found
     """
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            db.row_factory = aiosqlite.Row
+    catalog = await get_catalog()
+    item = catalog.get(item_name)
+    if item is None:
+        item = catalog.get_closest(
+            item_name, threshold=FUZZY_MATCH_THRESHOLD, margin=FUZZY_MATCH_MARGIN
+        )
+    if item is not None:
+        item["menu_version"] = catalog.version
+    return item
+
+
+# Function to read the cart of a session
+async def load_cart(session: str, parameters: Dict[str, Any]) -> Cart:
+    """
+    Read the cart of a Dialogflow session.
 
-            # Generate a new order number
-            cursor = await db.execute(
-                "SELECT MAX(order_number) as max_order FROM orders"
-            )
-            result = await cursor.fetchone()
-            max_order = result["max_order"] if result["max_order"] is not None else 0
-            new_order_number = max_order + 1
+    Args:
+        session: The session path of the webhook request
+        parameters: The session parameters of the webhook request
 
-            # Calculate the total amount
-            total_amount = 0
-            order_items = []
+    Returns:
+        The cart, empty if the session has none yet
+    """
+    version = parameters.get(CART_VERSION_PARAMETER)
+    if not CART_STORE or version is None:
+        # Sessions started before the cart store still carry their cart
+        return Cart.from_parameters(parameters)
+    return await cart_store.get(session, int(version))
 
-            for item_entry in items:
-                item_name = item_entry["item_name"]
-                quantity = item_entry.get("quantity", 1)
 
-                # Fetch the item to get its price
-                cursor = await db.execute(
-                    "SELECT id, price FROM items WHERE item_name = ? COLLATE NOCASE",
-                    (item_name,),
-                )
-                item = await cursor.fetchone()
+# Function to save the cart of a session
+async def save_cart(
+    session: str, parameters: Dict[str, Any], cart: Cart
+) -> Dict[str, Any]:
+    """
+    Save the cart of a Dialogflow session.
 
-                if not item:
-                    raise ValueError(f"Item '{item_name}' not found in the database")
+    Args:
+        session: The session path of the webhook request
+        parameters: The session parameters of the webhook request
+        cart: The changed cart
 
-                item_id = item["id"]
-                item_price = item["price"]
+    Returns:
+        The session parameters to send back, only the ones that changed
+    """
+    if not CART_STORE:
+        return cart.to_parameters()
 
-                total_amount += item_price * quantity
-                order_items.append({"item_id": item_id, "quantity": quantity})
+    changed: Dict[str, Any] = {
+        CART_VERSION_PARAMETER: await cart_store.save(session, cart)
+    }
+    if CART_PARAMETER in parameters:
+        # Dialogflow removes a parameter set to null
+        changed[CART_PARAMETER] = None
+    return changed
 
-            # Create the order
-            current_time = datetime.datetime.now().isoformat()
-            cursor = await db.execute(
-                "INSERT INTO orders (order_number, amount, created_at) VALUES (?, ?, ?)",
-                (new_order_number, total_amount, current_time),
-            )
-            order_id = cursor.lastrowid
 
-            # Add the order items
-            for order_item in order_items:
-                await db.execute(
-                    "INSERT INTO order_items (order_id, item_id, quantity) VALUES (?, ?, ?)",
-                    (order_id, order_item["item_id"], order_item["quantity"]),
+# Function to create a new order
+async def create_order(
+    items: List[Dict[str, Any]], menu_version: Optional[int] = None
+) -> int:
+    """
+    Create a new order with the provided items.
+
+    Lines of a cart priced at the current menu version are taken as they
+    are. With an older menu_version only the items whose price changed since
+    are re-priced, without one every line is priced from the catalog.
+
+    Args:
+        items: A list of dictionaries with keys 'item_name' and 'quantity',
+            and 'price' and 'item_id' as the cart priced the item
+        menu_version: The menu version of the cart, None if it is not known
+
+    Returns:
+        The order number of the created order
+    """
+    try:
+        catalog = await get_catalog(max_age=0)
+
+        total_amount = 0
+        order_items = []
+        summary_items = []
+
+        for item_entry in items:
+            item_name = item_entry["item_name"]
+            quantity = item_entry.get("quantity", 1)
+            item_id = item_entry.get("item_id")
+            price = item_entry.get("price")
+
+            # Lines whose price may be out of date are priced from the catalog
+            if (
+                menu_version is None
+                or item_id is None
+                or price is None
+                or (
+                    menu_version < catalog.version
+                    and _price_changed(catalog.get_by_id(item_id), menu_version)
                 )
+            ):
+                item = catalog.get(item_name)
+                if not item:
+                    raise ValueError(f"Item '{item_name}' not found in the database")
+                item_id, item_name, price = item["id"], item["item_name"], item["price"]
+
+            total_amount += price * quantity
+            order_items.append((item_id, quantity, price))
+            summary_items.append(
+                {
+                    "item_name": item_name,
+                    "price": price,
+                    "quantity": quantity,
+                }
+            )
 
-            await db.commit()
-            return new_order_number
+        # Generate a new order number
+        new_order_number = await order_numbers.next_value()
+
+        # Write the order and its lines, committed together with the other
+        # orders confirmed at the same moment
+        await order_writer.submit(new_order_number, total_amount, order_items)
+
+        order_cache.put(
+            new_order_number,
+            {
+                "order_number": new_order_number,
+                "amount": total_amount,
+                "items": summary_items,
+            },
+        )
+        return new_order_number
     except Exception as e:
         print(f"Error creating order: {e}")
         raise
 
 
-# Function to get order details
-async def get_order_details(order_id: int) -> Optional[Dict[str, Any]]:
+def _price_changed(item: Optional[Dict[str, Any]], menu_version: int) -> bool:
+    """Whether an item left the menu or changed its price after menu_version."""
+    return item is None or item["price_version"] > menu_version
+
+
+# Function to get the summary of an order
+async def get_order_summary(order_number: int) -> Optional[Dict[str, Any]]:
     """
-    Get the details of an order by its ID or order number.
+    Get an order and its lines with a single query, cached by order number.
 
     Args:
-        order_id: The ID or order number of the order
+        order_number: The order number of the order
 
     Returns:
-        A dictionary with the order details or None if not found
+        A dictionary with order_number, amount and items (item_name, price and
+        quantity of each line) or None if not found
     """
-    try:
-        async with aiosqlite.connect(DB_PATH) as db:
-            db.row_factory = aiosqlite.Row
-
-            # First check if the provided ID is an order_number
-            cursor = await db.execute(
-                "SELECT id, order_number, amount, created_at FROM orders WHERE order_number = ?",
-                (order_id,),
-            )
-            order = await cursor.fetchone()
-
-            # If not found by order_number, try finding by id
-            if not order:
-                cursor = await db.execute(
-                    "SELECT id, order_number, amount, created_at FROM orders WHERE id = ?",
-                    (order_id,),
-                )
-                order = await cursor.fetchone()
+    summary = order_cache.get(order_number)
+    if summary is not None:
+        return summary
 
-            # If still not found, return None
-            if not order:
-                return None
-
-            order_dict = dict(order)
-            order_dict["created_at"] = order_dict["created_at"]
-            order_dict["items"] = []
-
-            # Get the items in this order
+    try:
+        async with pool.reader() as db:
             cursor = await db.execute(
                 """
-                SELECT i.id, i.item_name, i.ingredients, i.quantity as item_quantity, 
-                       i.price, i.spicy_level, i.synonyms, oi.quantity as order_quantity
-                FROM order_items oi
-                JOIN items i ON oi.item_id = i.id
-                WHERE oi.order_id = ?
+                SELECT o.order_number, o.amount, i.item_name, oi.unit_price, oi.quantity
+                FROM orders o
+                LEFT JOIN order_items oi ON oi.order_id = o.id
+                LEFT JOIN items i ON i.id = oi.item_id
+                WHERE o.order_number = ?
+                ORDER BY oi.id
             """,
-                (order_dict["id"],),
+                (order_number,),
             )
-
-            items = await cursor.fetchall()
-            for item in items:
-                item_dict = dict(item)
-                item_dict["ingredients"] = json.loads(item_dict["ingredients"])
-                item_dict["synonyms"] = json.loads(item_dict["synonyms"])
-                item_dict["quantity"] = item_dict.pop(
-                    "order_quantity"
-                )  # Rename order_quantity to quantity
-                item_dict["item_quantity"] = item_dict[
-                    "item_quantity"
-                ]  # Keep the original item quantity
-                order_dict["items"].append(item_dict)
-
-            return order_dict
+            rows = await cursor.fetchall()
     except Exception as e:
         print(f"Error fetching order: {e}")
         raise
 
+    if not rows:
+        return None
+
+    summary = {
+        "order_number": rows[0]["order_number"],
+        "amount": rows[0]["amount"],
+        "items": [
+            {
+                "item_name": row["item_name"],
+                "price": row["unit_price"],
+                "quantity": row["quantity"],
+            }
+            for row in rows
+            if row["item_name"] is not None
+        ],
+    }
+    order_cache.put(order_number, summary)
+    return summary
+
 
 # Function to add all items from a JSON file
-async def add_items_from_json(json_file_path: str) -> None:
+async def add_items_from_json(
+    json_file_path: str,
+    chunk_size: int = 1000,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
     """
     Add all items from a JSON file to the database.
 
+    The file is parsed incrementally and upserted chunk by chunk, each chunk
+    in its own transaction, so memory stays flat whatever the file size.
+    Existing items keep their ids, so order_items keep pointing at them.
+
+    Every import is a new menu version. New items and items whose price
+    changes get it as their price_version, and the menu version is only
+    bumped once every chunk is written. A catalog loaded halfway through
+    has the old version, so none of its prices can pass for the new menu.
+
     Args:
         json_file_path: Path to the JSON file containing items
+        chunk_size: Number of items written per transaction
+        progress: Called with the number of items imported so far after
+            every chunk, prints the count by default
+
+    Returns:
+        The number of items imported
     """
     try:
         # Check if the file exists
         if not os.path.exists(json_file_path):
             raise FileNotFoundError(f"JSON file not found: {json_file_path}")
 
-        # Load items from the JSON file
+        async with pool.reader() as db:
+            cursor = await db.execute(
+                "SELECT value + 1 FROM sequences WHERE name = 'menu_version'"
+            )
+            (menu_version,) = await cursor.fetchone()
+            await cursor.close()
+
+        imported = 0
         with open(json_file_path, "r") as file:
-            items = json.load(file)
-
-        async with aiosqlite.connect(DB_PATH) as db:
-            for item in items:
-                # Convert lists to JSON strings for storage
-                ingredients_json = json.dumps(item["ingredients"])
-                synonyms_json = json.dumps(item["synonyms"])
-
-                # Insert the item, or update if it already exists
-                await db.execute(
-                    """
-                    INSERT OR REPLACE INTO items 
-                    (item_name, ingredients, quantity, price, spicy_level, synonyms)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """,
+            for chunk in iter_chunks(iter_json_array(file), chunk_size):
+                rows = [
                     (
                         item["item_name"],
-                        ingredients_json,
+                        # Convert lists to JSON strings for storage
+                        json.dumps(item["ingredients"]),
                         item["quantity"],
                         item["price"],
                         item["spicy_level"],
-                        synonyms_json,
-                    ),
-                )
-
+                        json.dumps(item["synonyms"]),
+                        menu_version,
+                    )
+                    for item in chunk
+                ]
+                names = [(row[0],) for row in rows]
+
+                async with pool.writer() as db:
+                    await db.execute("BEGIN IMMEDIATE")
+
+                    # Insert the items, or update the ones that already exist
+                    await db.executemany(
+                        """
+                        INSERT INTO items
+                        (item_name, ingredients, quantity, price, spicy_level, synonyms,
+                         price_version)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (item_name) DO UPDATE SET
+                            ingredients = excluded.ingredients,
+                            quantity = excluded.quantity,
+                            price = excluded.price,
+                            spicy_level = excluded.spicy_level,
+                            synonyms = excluded.synonyms,
+                            price_version = CASE
+                                WHEN items.price = excluded.price
+                                THEN items.price_version
+                                ELSE excluded.price_version
+                            END
+                    """,
+                        rows,
+                    )
+
+                    # Keep the normalized synonyms of these items in sync
+                    await db.executemany(
+                        """
+                        DELETE FROM item_synonyms
+                        WHERE item_id = (SELECT id FROM items WHERE item_name = ?)
+                    """,
+                        names,
+                    )
+                    await db.executemany(
+                        """
+                        INSERT OR IGNORE INTO item_synonyms (item_id, synonym)
+                        SELECT items.id, json_each.value
+                        FROM items, json_each(items.synonyms)
+                        WHERE items.item_name = ?
+                    """,
+                        names,
+                    )
+
+                    await db.commit()
+
+                imported += len(rows)
+                if progress is None:
+                    print(f"Imported {imported} items")
+                else:
+                    progress(imported)
+
+        async with pool.writer() as db:
+            await db.execute(
+                "UPDATE sequences SET value = MAX(value, ?) WHERE name = 'menu_version'",
+                (menu_version,),
+            )
             await db.commit()
-            print(f"Successfully added {len(items)} items to the database")
+
+        print(f"Successfully added {imported} items to the database")
+
+        await load_catalog()
+        return imported
     except Exception as e:
         print(f"Error adding items from JSON: {e}")
         raise
@@ -317,15 +569,6 @@ async def add_items_from_json(json_file_path: str) -> None:
 #     # order_number = await create_order(order_items)
 #     # print(f"Created order #{order_number}")
 
-#     # # Get order details
-#     # order = await get_order_details(1)
-#     # if order:
-#     #     print(f"Order #{order['order_number']} details:")
-#     #     print(f"Amount: {order['amount']}")
-#     #     print(f"Created at: {order['created_at']}")
-#     #     print("Items:")
-#     #     for item in order["items"]:
-#     #         print(f"- {item['quantity']}x {item['item_name']} (₹{item['price']} each)")
 #     pass
 
 
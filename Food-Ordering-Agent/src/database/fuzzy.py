@@ -0,0 +1,170 @@
+import math
+from typing import Any, Dict, FrozenSet, KeysView, List, Optional, Tuple
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Trigrams of every word padded like pg_trgm, "rice" -> "  r", " ri", ..."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i : i + 3])
+    return frozenset(grams)
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigrams to keys for fuzzy name matching.
+
+    Similarity is the Jaccard index of the trigram sets, as in pg_trgm. Every
+    key holds a slot, the postings of a trigram are an int with the bits of
+    the slots of its keys set. A search adds up the postings of the query's
+    trigrams bit-sliced, one int per bit of the count, so the trigrams every
+    key shares with the query are counted in a few big-int operations
+    however long the postings are. Only the keys whose count can reach the
+    threshold for their trigram count are scored.
+    """
+
+    def __init__(self) -> None:
+        self._grams: Dict[str, FrozenSet[str]] = {}
+        self._values: Dict[str, Any] = {}
+        self._slots: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._free: List[int] = []
+        # Bits of the slots of the keys holding a trigram, and of the keys
+        # with a trigram count
+        self._postings: Dict[str, int] = {}
+        self._sizes: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._grams
+
+    def keys(self) -> KeysView[str]:
+        return self._grams.keys()
+
+    def add(self, key: str, value: Any) -> None:
+        """Add a key, or replace the value of an existing one."""
+        self._values[key] = value
+        if key in self._grams:
+            return
+
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = key
+        else:
+            slot = len(self._keys)
+            self._keys.append(key)
+        self._slots[key] = slot
+
+        grams = trigrams(key)
+        self._grams[key] = grams
+        bit = 1 << slot
+        for gram in grams:
+            self._postings[gram] = self._postings.get(gram, 0) | bit
+        self._sizes[len(grams)] = self._sizes.get(len(grams), 0) | bit
+
+    def remove(self, key: str) -> None:
+        grams = self._grams.pop(key, None)
+        if grams is None:
+            return
+
+        del self._values[key]
+        slot = self._slots.pop(key)
+        self._keys[slot] = None
+        self._free.append(slot)
+
+        bit = 1 << slot
+        for gram in grams:
+            self._postings[gram] ^= bit
+            if not self._postings[gram]:
+                del self._postings[gram]
+        self._sizes[len(grams)] ^= bit
+        if not self._sizes[len(grams)]:
+            del self._sizes[len(grams)]
+
+    def search(
+        self, query: str, threshold: float, margin: float = 0.0
+    ) -> Optional[Tuple[Any, float]]:
+        """
+        Find the key most similar to the query.
+
+        Args:
+            query: Normalized text to match
+            threshold: Minimum similarity, between 0 and 1
+            margin: A key with another value scoring within this margin of
+                the best one makes the match ambiguous
+
+        Returns:
+            (value, similarity) of the best key or None if nothing reaches the
+            threshold or the match is ambiguous
+        """
+        query_grams = trigrams(query)
+        if not query_grams or threshold <= 0:
+            return None
+        query_size = len(query_grams)
+
+        # counts[i] has the bits of the keys whose shared trigram count has
+        # bit i set, every posting is added with a ripple carry
+        counts: List[int] = []
+        for gram in query_grams:
+            carry = self._postings.get(gram, 0)
+            for i, count in enumerate(counts):
+                if not carry:
+                    break
+                counts[i], carry = count ^ carry, count & carry
+            if carry:
+                counts.append(carry)
+
+        # A key of size trigrams reaches the threshold sharing at least
+        # needed of them, keys of sizes needing the same count are selected
+        # together
+        selected: Dict[int, int] = {}
+        for size, keys in self._sizes.items():
+            needed = math.ceil(
+                threshold * (query_size + size) / (1 + threshold) - 1e-9
+            )
+            if needed <= min(query_size, size) and needed < 1 << len(counts):
+                selected[needed] = selected.get(needed, 0) | keys
+
+        scored: List[Tuple[float, str]] = []
+        for needed, keys in selected.items():
+            keys &= self._at_least(counts, needed)
+            while keys:
+                bit = keys & -keys
+                keys ^= bit
+                key = self._keys[bit.bit_length() - 1]
+                grams = self._grams[key]
+                shared = len(query_grams & grams)
+                score = shared / (query_size + len(grams) - shared)
+                if score >= threshold:
+                    scored.append((score, key))
+
+        if not scored:
+            return None
+
+        # Highest score first, ties broken by key for a stable answer
+        scored.sort(key=lambda entry: (-entry[0], entry[1]))
+        best_score, best_key = scored[0]
+        best_value = self._values[best_key]
+
+        for score, key in scored[1:]:
+            if best_score - score > margin:
+                break
+            if self._values[key] is not best_value:
+                return None
+        return best_value, best_score
+
+    @staticmethod
+    def _at_least(counts: List[int], needed: int) -> int:
+        """Bits of the keys whose bit-sliced count is at least needed."""
+        greater, equal = 0, -1
+        for i in range(len(counts) - 1, -1, -1):
+            if needed >> i & 1:
+                equal &= counts[i]
+            else:
+                greater |= equal & counts[i]
+                equal &= ~counts[i]
+        return greater | equal
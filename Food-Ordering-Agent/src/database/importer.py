@@ -0,0 +1,100 @@
+import json
+import re
+from typing import Any, Iterator, List, TextIO
+
+_WHITESPACE = " \t\n\r"
+
+# What may still follow a number decoded up to the end of the buffer, a
+# number cut at "0." or "1e" decodes as 0 or 1 before the cut
+_NUMBER_TAIL = re.compile(r"[0-9+\-.eE]*\Z")
+
+
+def iter_json_array(file: TextIO, read_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    Only read_size characters plus the element being decoded are held in
+    memory, so the file size does not matter.
+
+    Args:
+        file: A text file containing a JSON array
+        read_size: Number of characters read from the file at a time
+
+    Returns:
+        An iterator over the decoded elements
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        data = file.read(read_size)
+        if not data:
+            eof = True
+            return False
+        buffer = buffer[pos:] + data
+        pos = 0
+        return True
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                return ""
+
+    if peek() != "[":
+        raise ValueError("Expected a JSON array")
+    pos += 1
+
+    expect_comma = False
+    while True:
+        char = peek()
+        if char == "]":
+            return
+        if char == "":
+            raise ValueError("Unexpected end of JSON array")
+        if expect_comma:
+            if char != ",":
+                raise ValueError(f"Expected ',' in JSON array, got {char!r}")
+            pos += 1
+            peek()
+
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # A number cut off by the end of the buffer still decodes
+            if (
+                isinstance(element, (int, float))
+                and not isinstance(element, bool)
+                and not eof
+                and _NUMBER_TAIL.match(buffer, end)
+                and fill()
+            ):
+                continue
+            break
+
+        pos = end
+        expect_comma = True
+        yield element
+
+
+def iter_chunks(elements: Iterator[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """Group an iterator into lists of at most chunk_size elements."""
+    chunk = []
+    for element in elements:
+        chunk.append(element)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
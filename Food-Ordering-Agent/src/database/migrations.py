@@ -0,0 +1,276 @@
+import asyncio
+import datetime
+import sys
+from typing import List, Tuple
+
+import aiosqlite
+
+from src.database.pool import ConnectionPool
+
+# Numbered schema migrations, applied in order and never edited once shipped
+MIGRATIONS: List[Tuple[int, str, List[str]]] = [
+    (
+        1,
+        "create items, orders, order_items and sequences",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                item_name TEXT UNIQUE NOT NULL,
+                ingredients TEXT NOT NULL,
+                quantity TEXT NOT NULL,
+                price REAL NOT NULL,
+                spicy_level TEXT NOT NULL,
+                synonyms TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS orders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_number INTEGER UNIQUE NOT NULL,
+                amount REAL NOT NULL,
+                created_at TIMESTAMP NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS order_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_id INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL,
+                FOREIGN KEY (order_id) REFERENCES orders (id),
+                FOREIGN KEY (item_id) REFERENCES items (id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS sequences (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+            """,
+            """
+            INSERT OR IGNORE INTO sequences (name, value)
+            SELECT 'order_number', COALESCE(MAX(order_number), 0) FROM orders
+            """,
+        ],
+    ),
+    (
+        2,
+        "index order_items by order",
+        [
+            """
+            CREATE INDEX IF NOT EXISTS idx_order_items_order_id
+            ON order_items (order_id)
+            """,
+        ],
+    ),
+    (
+        3,
+        "case insensitive index on item names",
+        [
+            """
+            CREATE INDEX IF NOT EXISTS idx_items_item_name_nocase
+            ON items (item_name COLLATE NOCASE)
+            """,
+        ],
+    ),
+    (
+        4,
+        "normalized item_synonyms table",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS item_synonyms (
+                item_id INTEGER NOT NULL,
+                synonym TEXT NOT NULL COLLATE NOCASE,
+                PRIMARY KEY (synonym, item_id),
+                FOREIGN KEY (item_id) REFERENCES items (id)
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_item_synonyms_item_id
+            ON item_synonyms (item_id)
+            """,
+            """
+            INSERT OR IGNORE INTO item_synonyms (item_id, synonym)
+            SELECT items.id, json_each.value FROM items, json_each(items.synonyms)
+            """,
+        ],
+    ),
+    (
+        5,
+        "server side carts",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS carts (
+                session TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                lines TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_carts_expires_at
+            ON carts (expires_at)
+            """,
+        ],
+    ),
+    (
+        6,
+        "menu versions for cart price snapshots",
+        [
+            # Menu version of the import that last changed the price of an item
+            "ALTER TABLE items ADD COLUMN price_version INTEGER NOT NULL DEFAULT 0",
+            "INSERT OR IGNORE INTO sequences (name, value) VALUES ('menu_version', 0)",
+            "ALTER TABLE carts ADD COLUMN menu_version INTEGER",
+        ],
+    ),
+    (
+        7,
+        "unit prices of order lines",
+        [
+            # The price a line was ordered at, later menu imports must not
+            # change what an order shows. Older lines get the current price,
+            # the best that is known of them.
+            "ALTER TABLE order_items ADD COLUMN unit_price REAL",
+            """
+            UPDATE order_items SET unit_price = (
+                SELECT price FROM items WHERE items.id = order_items.item_id
+            )
+            """,
+        ],
+    ),
+]
+
+# Hot queries and the index each of them must use
+QUERY_PLANS: List[Tuple[str, str]] = [
+    (
+        "SELECT id, price FROM items WHERE item_name = ? COLLATE NOCASE",
+        "idx_items_item_name_nocase",
+    ),
+    (
+        "SELECT item_id FROM item_synonyms WHERE synonym = ?",
+        "sqlite_autoindex_item_synonyms_1",
+    ),
+    (
+        "SELECT id, order_number, amount, created_at FROM orders WHERE order_number = ?",
+        "sqlite_autoindex_orders_1",
+    ),
+    (
+        "SELECT item_id, quantity FROM order_items WHERE order_id = ?",
+        "idx_order_items_order_id",
+    ),
+    (
+        "SELECT version, lines, menu_version, expires_at FROM carts WHERE session = ?",
+        "sqlite_autoindex_carts_1",
+    ),
+    (
+        """
+        SELECT o.order_number, o.amount, i.item_name, oi.unit_price, oi.quantity
+        FROM orders o
+        LEFT JOIN order_items oi ON oi.order_id = o.id
+        LEFT JOIN items i ON i.id = oi.item_id
+        WHERE o.order_number = ?
+        """,
+        "idx_order_items_order_id",
+    ),
+]
+
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    """Return the version of the last applied migration, 0 for a new database."""
+    cursor = await db.execute("SELECT MAX(version) FROM schema_version")
+    row = await cursor.fetchone()
+    await cursor.close()
+    return row[0] or 0
+
+
+async def migrate(pool: ConnectionPool) -> int:
+    """
+    Apply every pending migration, each one in its own transaction.
+
+    Args:
+        pool: The connection pool of the database to migrate
+
+    Returns:
+        The schema version after migrating
+    """
+    async with pool.writer() as db:
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP NOT NULL
+            )
+        """)
+        await db.commit()
+
+        version = await get_schema_version(db)
+        for number, description, statements in MIGRATIONS:
+            if number <= version:
+                continue
+
+            await db.execute("BEGIN IMMEDIATE")
+            # Another process may have migrated while we waited for the lock
+            if await get_schema_version(db) >= number:
+                await db.rollback()
+                continue
+
+            for statement in statements:
+                await db.execute(statement)
+            await db.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (number, description, datetime.datetime.now().isoformat()),
+            )
+            await db.commit()
+            print(f"Applied migration {number}: {description}")
+
+        return await get_schema_version(db)
+
+
+async def check_query_plans(db: aiosqlite.Connection) -> List[str]:
+    """
+    Run EXPLAIN QUERY PLAN on the hot queries.
+
+    Args:
+        db: A connection to a migrated database
+
+    Returns:
+        One message per query that does not use its expected index
+    """
+    # EXPLAIN does not read the database, so make a long-lived connection
+    # notice schema changes made by other connections first
+    cursor = await db.execute("SELECT COUNT(*) FROM sqlite_master")
+    await cursor.close()
+
+    problems = []
+    for query, index in QUERY_PLANS:
+        cursor = await db.execute(f"EXPLAIN QUERY PLAN {query}", (None,))
+        details = [row[-1] for row in await cursor.fetchall()]
+        await cursor.close()
+
+        if not any(index in detail for detail in details):
+            problems.append(f"{query!r} does not use {index}: {details}")
+    return problems
+
+
+async def main(db_path: str) -> int:
+    pool = ConnectionPool(db_path, max_readers=1)
+    try:
+        version = await migrate(pool)
+        print(f"Schema version: {version}")
+
+        async with pool.reader() as db:
+            problems = await check_query_plans(db)
+    finally:
+        await pool.close()
+
+    for problem in problems:
+        print(f"Query plan regression: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    # python -m src.database.migrations [path/to/food_database.db]
+    from src.database.database import DB_PATH
+
+    sys.exit(asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else DB_PATH)))
@@ -0,0 +1,197 @@
+import asyncio
+import datetime
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.database.pool import ConnectionPool
+
+
+class OrderWriter:
+    """
+    Group commit for new orders.
+
+    An order is written as soon as the writer connection is free, a lone
+    order never waits for company. Orders submitted while the connection is
+    taken, by the previous batch or another write, are collected meanwhile
+    and written together in one transaction, up to max_batch, so a burst of
+    order confirmations pays for a single commit. Every order is written
+    inside its own savepoint, a failing order is rolled back alone and only
+    its caller sees the error.
+    """
+
+    def __init__(self, pool: ConnectionPool, max_batch: int = 64) -> None:
+        self.pool = pool
+        self.max_batch = max_batch
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._batches = 0
+        self._orders = 0
+        self._failed = 0
+        self._batch_size_max = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._commit_total = 0.0
+        self._commit_max = 0.0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(
+        self, order_number: int, amount: float, lines: List[Tuple[int, Any, float]]
+    ) -> None:
+        """
+        Write one order and wait until its batch is committed.
+
+        Args:
+            order_number: The order number of the new order
+            amount: The total amount of the order
+            lines: (item_id, quantity, unit_price) of every order line
+
+        Raises:
+            The error that made this order, or its whole batch, fail
+        """
+        self._ensure_started()
+
+        future = asyncio.get_running_loop().create_future()
+        submitted = time.perf_counter()
+        self._queue.put_nowait(((order_number, amount, lines), future))
+        try:
+            await future
+        finally:
+            latency = time.perf_counter() - submitted
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+
+    async def close(self) -> None:
+        """Write every pending order and stop the background task."""
+        if self._task is None:
+            return
+        if not self._task.done():
+            self._queue.put_nowait(None)
+            await self._task
+        self._task = None
+        self._queue = None
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            requested = time.perf_counter()
+            acquired = None
+            try:
+                async with self.pool.writer() as db:
+                    acquired = time.perf_counter()
+                    # Orders that came in while waiting for the connection
+                    # join the batch, nothing waits for more to arrive
+                    while len(batch) < self.max_batch and not self._queue.empty():
+                        entry = self._queue.get_nowait()
+                        if entry is None:
+                            stopping = True
+                            break
+                        batch.append(entry)
+
+                    failed = await self._write(db, batch)
+            except Exception as e:
+                # Nothing of this batch was committed
+                failed = [(future, e) for _, future in batch]
+
+            finished = time.perf_counter()
+            if acquired is None:
+                # Failed while waiting for the writer connection
+                acquired = finished
+            self._finish(batch, failed, acquired - requested, finished - acquired)
+
+    async def _write(
+        self, db: Any, batch: List[Tuple[Tuple, asyncio.Future]]
+    ) -> List[Tuple[asyncio.Future, Exception]]:
+        """Write a batch in one transaction, returns the orders that failed."""
+        current_time = datetime.datetime.now().isoformat()
+        failed: List[Tuple[asyncio.Future, Exception]] = []
+        await db.execute("BEGIN IMMEDIATE")
+
+        for (order_number, amount, lines), future in batch:
+            await db.execute("SAVEPOINT pending_order")
+            try:
+                cursor = await db.execute(
+                    "INSERT INTO orders (order_number, amount, created_at) VALUES (?, ?, ?)",
+                    (order_number, amount, current_time),
+                )
+                order_id = cursor.lastrowid
+                await db.executemany(
+                    """
+                    INSERT INTO order_items (order_id, item_id, quantity, unit_price)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    [(order_id, *line) for line in lines],
+                )
+                await db.execute("RELEASE pending_order")
+            except Exception as e:
+                await db.execute("ROLLBACK TO pending_order")
+                await db.execute("RELEASE pending_order")
+                failed.append((future, e))
+
+        await db.commit()
+        return failed
+
+    def _finish(
+        self,
+        batch: List[Tuple[Tuple, asyncio.Future]],
+        failed: List[Tuple[asyncio.Future, Exception]],
+        wait_time: float,
+        commit_time: float,
+    ) -> None:
+        errors = {id(future): e for future, e in failed}
+        for _, future in batch:
+            if future.done():
+                continue
+            if id(future) in errors:
+                future.set_exception(errors[id(future)])
+            else:
+                future.set_result(None)
+
+        self._batches += 1
+        self._orders += len(batch)
+        self._failed += len(failed)
+        self._batch_size_max = max(self._batch_size_max, len(batch))
+        self._wait_total += wait_time
+        self._wait_max = max(self._wait_max, wait_time)
+        self._commit_total += commit_time
+        self._commit_max = max(self._commit_max, commit_time)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Group size and latency statistics, times are in ms.
+
+        wait is the time a batch waited for the writer connection, commit the
+        time from getting it to the end of the transaction.
+        """
+        return {
+            "max_batch": self.max_batch,
+            "batches": self._batches,
+            "orders": self._orders,
+            "failed_orders": self._failed,
+            "batch_size_avg": self._orders / self._batches if self._batches else 0.0,
+            "batch_size_max": self._batch_size_max,
+            "wait_avg_ms": (
+                self._wait_total / self._batches * 1000 if self._batches else 0.0
+            ),
+            "wait_max_ms": self._wait_max * 1000,
+            "commit_avg_ms": (
+                self._commit_total / self._batches * 1000 if self._batches else 0.0
+            ),
+            "commit_max_ms": self._commit_max * 1000,
+            "latency_avg_ms": (
+                self._latency_total / self._orders * 1000 if self._orders else 0.0
+            ),
+            "latency_max_ms": self._latency_max * 1000,
+        }
@@ -0,0 +1,212 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiosqlite
+
+
+# PRAGMAs applied to every connection and the WAL checkpoint interval in
+# seconds, picked per environment with DB_PROFILE
+STORAGE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "rollback": {
+        "pragmas": {
+            "journal_mode": "DELETE",
+            "synchronous": "FULL",
+            "busy_timeout": 5000,
+        },
+        "checkpoint_interval": None,
+    },
+    "wal": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+            "mmap_size": 256 * 1024 * 1024,
+            "cache_size": -64 * 1024,
+        },
+        "checkpoint_interval": 60.0,
+    },
+}
+
+
+class ConnectionPool:
+    """
+    A small pool of long-lived aiosqlite connections.
+
+    Reader connections are handed out from a bounded queue. All writes go
+    through one dedicated writer connection guarded by a lock, SQLite only
+    allows a single writer at a time anyway.
+    """
+
+    def __init__(
+        self, db_path: str, max_readers: int = 4, profile: str = "rollback"
+    ) -> None:
+        self.db_path = db_path
+        self.max_readers = max_readers
+        self.profile = profile
+        self.pragmas: Dict[str, Any] = STORAGE_PROFILES[profile]["pragmas"]
+        self.checkpoint_interval: Optional[float] = STORAGE_PROFILES[profile][
+            "checkpoint_interval"
+        ]
+
+        self._readers: Optional[asyncio.Queue] = None
+        self._connections: List[aiosqlite.Connection] = []
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock: Optional[asyncio.Lock] = None
+        self._open_lock = asyncio.Lock()
+        self._checkpoint_task: Optional[asyncio.Task] = None
+
+        self._readers_in_use = 0
+        self._writer_in_use = False
+        self._reader_acquires = 0
+        self._writer_acquires = 0
+        self._reader_wait_total = 0.0
+        self._reader_wait_max = 0.0
+        self._writer_wait_total = 0.0
+        self._writer_wait_max = 0.0
+        self._checkpoints = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    async def _connect(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.db_path)
+        db.row_factory = aiosqlite.Row
+        self._connections.append(db)
+        for name, value in self.pragmas.items():
+            cursor = await db.execute(f"PRAGMA {name} = {value}")
+            await cursor.close()
+        return db
+
+    async def open(self) -> None:
+        """Open the writer and all reader connections, safe to call twice."""
+        async with self._open_lock:
+            if self.is_open:
+                return
+
+            try:
+                # The writer goes first, it switches the journal mode
+                writer = await self._connect()
+                readers = asyncio.Queue(maxsize=self.max_readers)
+                for _ in range(self.max_readers):
+                    readers.put_nowait(await self._connect())
+            except Exception:
+                await self._close_connections()
+                raise
+
+            self._writer = writer
+            self._readers = readers
+            self._writer_lock = asyncio.Lock()
+
+            if self.pragmas.get("journal_mode") == "WAL" and self.checkpoint_interval:
+                self._checkpoint_task = asyncio.create_task(self._checkpoint_loop())
+
+    async def close(self) -> None:
+        """Close every connection of the pool."""
+        async with self._open_lock:
+            await self._close_connections()
+
+    async def _close_connections(self) -> None:
+        if self._checkpoint_task is not None:
+            self._checkpoint_task.cancel()
+            try:
+                await self._checkpoint_task
+            except asyncio.CancelledError:
+                pass
+            self._checkpoint_task = None
+
+        connections, self._connections = self._connections, []
+        self._readers = None
+        self._writer = None
+        self._writer_lock = None
+        for db in connections:
+            await db.close()
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a reader connection, waits while all of them are in use."""
+        if not self.is_open:
+            await self.open()
+
+        readers = self._readers
+        started = time.perf_counter()
+        db = await readers.get()
+        waited = time.perf_counter() - started
+
+        self._reader_acquires += 1
+        self._reader_wait_total += waited
+        self._reader_wait_max = max(self._reader_wait_max, waited)
+        self._readers_in_use += 1
+        try:
+            yield db
+        finally:
+            self._readers_in_use -= 1
+            readers.put_nowait(db)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """
+        Borrow the writer connection.
+
+        Uncommitted work is rolled back if the block raises.
+        """
+        if not self.is_open:
+            await self.open()
+
+        started = time.perf_counter()
+        async with self._writer_lock:
+            waited = time.perf_counter() - started
+
+            self._writer_acquires += 1
+            self._writer_wait_total += waited
+            self._writer_wait_max = max(self._writer_wait_max, waited)
+            self._writer_in_use = True
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            finally:
+                self._writer_in_use = False
+
+    async def checkpoint(self) -> None:
+        """Copy the WAL back into the database file without blocking readers."""
+        async with self.writer() as db:
+            cursor = await db.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            await cursor.close()
+        self._checkpoints += 1
+
+    async def _checkpoint_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                print(f"Error checkpointing the database: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Usage and wait time statistics of the pool, times are in ms."""
+        return {
+            "open": self.is_open,
+            "profile": self.profile,
+            "max_readers": self.max_readers,
+            "readers_in_use": self._readers_in_use,
+            "writer_in_use": self._writer_in_use,
+            "reader_acquires": self._reader_acquires,
+            "reader_wait_avg_ms": _avg_ms(
+                self._reader_wait_total, self._reader_acquires
+            ),
+            "reader_wait_max_ms": self._reader_wait_max * 1000,
+            "writer_acquires": self._writer_acquires,
+            "writer_wait_avg_ms": _avg_ms(
+                self._writer_wait_total, self._writer_acquires
+            ),
+            "writer_wait_max_ms": self._writer_wait_max * 1000,
+            "checkpoints": self._checkpoints,
+        }
+
+
+def _avg_ms(total: float, count: int) -> float:
+    return total / count * 1000 if count else 0.0
@@ -1,13 +1,85 @@
-from typing import Dict, Any
-
-from google.cloud import dialogflowcx_v3 as dialogflow
-from google.oauth2 import service_account
+from typing import Any, Dict, List, Optional, Tuple
 
 from src import logging
+from src.json_logging import log_sample
 from src import config
 
 logger = logging.getLogger(__name__)
 
+# Options of the channel to Dialogflow. Keepalive pings hold the connection
+# open between messages and find a dead one before a message waits on it
+CHANNEL_OPTIONS: List[Tuple[str, Any]] = [
+    ("grpc.keepalive_time_ms", int(config.DIALOGFLOW_KEEPALIVE_SECONDS * 1000)),
+    ("grpc.keepalive_timeout_ms", 20000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+# Built on first use and shared by every message of this worker
+credentials = None
+client = None
+
+
+def get_credentials():
+    """The service account credentials of the agent, they refresh their token."""
+    global credentials
+    if credentials is None:
+        from google.oauth2 import service_account
+
+        credentials = service_account.Credentials.from_service_account_info(
+            config.SERVICE_ACCOUNT_JSON
+        )
+    return credentials
+
+
+def create_client(channel: Optional[Any] = None):
+    """
+    Create a Dialogflow sessions client.
+
+    Args:
+        channel: A gRPC channel to use, by default a new channel to Dialogflow
+            with the agent credentials and CHANNEL_OPTIONS
+
+    Returns:
+        A SessionsAsyncClient, close it with its transport
+    """
+    from google.cloud import dialogflowcx_v3 as dialogflow
+    from google.cloud.dialogflowcx_v3.services.sessions.transports import (
+        SessionsGrpcAsyncIOTransport,
+    )
+
+    if channel is not None:
+        return dialogflow.SessionsAsyncClient(
+            transport=SessionsGrpcAsyncIOTransport(channel=channel)
+        )
+
+    def create_channel(host: str, options: List[Tuple[str, Any]], **kwargs: Any):
+        return SessionsGrpcAsyncIOTransport.create_channel(
+            host, options=[*options, *CHANNEL_OPTIONS], **kwargs
+        )
+
+    return dialogflow.SessionsAsyncClient(
+        transport=SessionsGrpcAsyncIOTransport(
+            credentials=get_credentials(), channel=create_channel
+        )
+    )
+
+
+def get_client():
+    """The shared sessions client, the channel binds to the running event loop."""
+    global client
+    if client is None:
+        client = create_client()
+    return client
+
+
+async def close_client() -> None:
+    """Close the shared client, called from the app lifespan."""
+    global client
+    if client is not None:
+        closing, client = client, None
+        await closing.transport.close()
+
 
 async def detect_intent_async(
     session_id: str,
@@ -32,14 +104,13 @@ async def detect_intent_async(
         Dictionary containing intent detection results
     """
 
-    try:
-        # Set up credentials
-        credentials = service_account.Credentials.from_service_account_info(
-            config.SERVICE_ACCOUNT_JSON
-        )
+    # Imported here, the Dialogflow client takes half a second to import and
+    # main.py warms it up in the background instead
+    from google.cloud import dialogflowcx_v3 as dialogflow
 
-        # Create the client with credentials
-        client = dialogflow.SessionsAsyncClient(credentials=credentials)
+    try:
+        # One client and channel per worker, no handshake per message
+        client = get_client()
 
         # Build the session path
         session_path = client.session_path(
@@ -60,7 +131,11 @@ async def detect_intent_async(
         # Make the async call
         response = await client.detect_intent(request=request)
 
-        logger.info(response.query_result.response_messages)
+        log_sample(
+            logger,
+            "Dialogflow response messages",
+            response.query_result.response_messages,
+        )
 
         response_messages = []
 
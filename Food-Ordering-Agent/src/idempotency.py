@@ -0,0 +1,293 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import aiosqlite
+
+from src import config, logging
+from src.fast_json import encode_webhook_response
+from src.registry import Handler, remaining
+from src.schemas import WebhookRequest, WebhookResponse
+
+logger = logging.getLogger(__name__)
+
+# detectIntentResponseId and tag of a webhook call
+Key = Tuple[str, str]
+
+
+class IdempotencyStore:
+    """
+    Responses of side-effecting handlers by detectIntentResponseId and tag.
+
+    Dialogflow retries a webhook call that timed out with the same
+    detectIntentResponseId. A retry of a completed call gets the stored
+    response instead of running the handler again, a retry arriving while
+    the first call still runs waits for it and gets its response.
+
+    Responses are kept for ttl seconds in memory and, with a db_path, in
+    SQLite as well, where the workers of a host share them and they outlive
+    a restart. With SQLite a call first claims its key there, a retry
+    reaching another worker while the call runs finds the claim and polls
+    for the response every poll_interval seconds until its deadline runs
+    out. A claim left by a worker that died is taken over after claim_ttl
+    seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        max_size: int = 10000,
+        db_path: Optional[str] = None,
+        claim_ttl: float = 30.0,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.db_path = db_path
+        self.claim_ttl = claim_ttl
+        self.poll_interval = poll_interval
+        self._responses: "OrderedDict[Key, Tuple[float, WebhookResponse]]" = (
+            OrderedDict()
+        )
+        self._in_flight: Dict[Key, asyncio.Future] = {}
+        self._db: Optional[aiosqlite.Connection] = None
+        self.replayed = 0
+
+    async def open(self) -> None:
+        """Open the SQLite store, called from the app lifespan."""
+        if self.db_path is None or self._db is not None:
+            return
+        self._db = await aiosqlite.connect(self.db_path)
+        await self._db.execute("PRAGMA journal_mode = WAL")
+        await self._db.execute("PRAGMA busy_timeout = 5000")
+        await self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS webhook_responses (
+                key TEXT PRIMARY KEY,
+                response BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        await self._db.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_webhook_responses_expires_at
+            ON webhook_responses (expires_at)
+            """
+        )
+        # Calls running on some worker, by key
+        await self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS webhook_claims (
+                key TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        await self._db.commit()
+
+    async def close(self) -> None:
+        """Close the SQLite store, called from the app lifespan."""
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def get(self, key: Key) -> Optional[WebhookResponse]:
+        """The stored response of a call, None if there is none or it expired."""
+        now = time.time()
+        entry = self._responses.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                return entry[1]
+            del self._responses[key]
+
+        if self._db is None:
+            return None
+        try:
+            async with self._db.execute(
+                "SELECT response, expires_at FROM webhook_responses WHERE key = ?",
+                (_db_key(key),),
+            ) as cursor:
+                row = await cursor.fetchone()
+        except aiosqlite.Error as e:
+            logger.error(f"Error reading a stored webhook response: {e}")
+            return None
+        if row is None or row[1] <= now:
+            return None
+
+        response = WebhookResponse.model_validate_json(row[0])
+        self._remember(key, row[1], response)
+        return response
+
+    async def put(self, key: Key, response: WebhookResponse) -> None:
+        """Store the response of a completed call for ttl seconds."""
+        expires_at = time.time() + self.ttl
+        self._remember(key, expires_at, response)
+
+        if self._db is None:
+            return
+        # The handler already ran, a failed write only loses the retry guard
+        try:
+            await self._db.execute(
+                """
+                INSERT OR REPLACE INTO webhook_responses (key, response, expires_at)
+                VALUES (?, ?, ?)
+                """,
+                (_db_key(key), encode_webhook_response(response), expires_at),
+            )
+            await self._db.execute(
+                "DELETE FROM webhook_claims WHERE key = ?", (_db_key(key),)
+            )
+            await self._db.execute(
+                "DELETE FROM webhook_responses WHERE expires_at <= ?", (time.time(),)
+            )
+            await self._db.execute(
+                "DELETE FROM webhook_claims WHERE expires_at <= ?", (time.time(),)
+            )
+            await self._db.commit()
+        except aiosqlite.Error as e:
+            logger.error(f"Error storing a webhook response: {e}")
+
+    async def claim(self, key: Key) -> bool:
+        """
+        Claim a call for this worker in SQLite.
+
+        Returns:
+            False if another worker runs the call, True otherwise, also
+            without SQLite or when it cannot be reached
+        """
+        if self._db is None:
+            return True
+        now = time.time()
+        try:
+            cursor = await self._db.execute(
+                """
+                INSERT INTO webhook_claims (key, expires_at) VALUES (?, ?)
+                ON CONFLICT (key) DO UPDATE SET expires_at = excluded.expires_at
+                WHERE webhook_claims.expires_at <= ?
+                """,
+                (_db_key(key), now + self.claim_ttl, now),
+            )
+            claimed = cursor.rowcount == 1
+            await self._db.commit()
+        except aiosqlite.Error as e:
+            logger.error(f"Error claiming a webhook call: {e}")
+            return True
+        return claimed
+
+    async def release(self, key: Key) -> None:
+        """Drop the claim of a call that failed, so a retry runs it again."""
+        if self._db is None:
+            return
+        try:
+            await self._db.execute(
+                "DELETE FROM webhook_claims WHERE key = ?", (_db_key(key),)
+            )
+            await self._db.commit()
+        except aiosqlite.Error as e:
+            logger.error(f"Error releasing a webhook call: {e}")
+
+    async def _poll(self, key: Key) -> Optional[WebhookResponse]:
+        """
+        Wait for the response of a call another worker claimed.
+
+        Returns:
+            The response, or None once the claim expired without one and this
+            worker took it over
+
+        Raises:
+            asyncio.TimeoutError: The deadline of this call ran out first
+        """
+        while True:
+            response = await self.get(key)
+            if response is not None:
+                return response
+            if await self.claim(key):
+                return None
+
+            left = remaining()
+            if left is not None and left <= 0:
+                raise asyncio.TimeoutError(
+                    "The call is still running on another worker"
+                )
+            await asyncio.sleep(
+                self.poll_interval if left is None else min(self.poll_interval, left)
+            )
+
+    def _remember(self, key: Key, expires_at: float, response: WebhookResponse) -> None:
+        self._responses[key] = (expires_at, response)
+        self._responses.move_to_end(key)
+
+        # Every entry lives for the same ttl, so the oldest ones expire first
+        now = time.time()
+        while self._responses:
+            oldest_key, (oldest_expires_at, _) = next(iter(self._responses.items()))
+            if len(self._responses) <= self.max_size and oldest_expires_at > now:
+                break
+            del self._responses[oldest_key]
+
+    async def middleware(
+        self, tag: str, webhook_request: WebhookRequest, call_next: Handler
+    ) -> WebhookResponse:
+        """Registry middleware answering the retries of a call with its response."""
+        if not webhook_request.detectIntentResponseId:
+            return await call_next(webhook_request)
+        key = (webhook_request.detectIntentResponseId, tag)
+
+        while True:
+            response = await self.get(key)
+            if response is not None:
+                self.replayed += 1
+                logger.info("Replaying the stored response for the tag: %s", tag)
+                return response
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            # None when the first call failed, then this one runs the handler
+            response = await asyncio.shield(in_flight)
+            if response is not None:
+                self.replayed += 1
+                return response
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        response = None
+        try:
+            # Another worker may run the same call, then its response is used
+            stored = None if await self.claim(key) else await self._poll(key)
+            if stored is None:
+                # Claimed, the call may have finished on another worker between
+                # the lookup and the claim
+                stored = await self.get(key)
+                if stored is not None:
+                    await self.release(key)
+            if stored is not None:
+                self.replayed += 1
+                logger.info("Replaying the stored response for the tag: %s", tag)
+                response = stored
+                return response
+
+            try:
+                response = await call_next(webhook_request)
+            except BaseException:
+                await self.release(key)
+                raise
+            await self.put(key, response)
+            return response
+        finally:
+            del self._in_flight[key]
+            future.set_result(response)
+
+
+def _db_key(key: Key) -> str:
+    return f"{key[1]}:{key[0]}"
+
+
+webhook_idempotency = IdempotencyStore(
+    ttl=config.IDEMPOTENCY_TTL_SECONDS,
+    max_size=config.IDEMPOTENCY_MAX_SIZE,
+    db_path=config.IDEMPOTENCY_DB_PATH or None,
+    claim_ttl=config.IDEMPOTENCY_CLAIM_SECONDS,
+)
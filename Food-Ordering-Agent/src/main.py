@@ -1,69 +1,164 @@
+import asyncio
+from contextlib import asynccontextmanager
 from typing import Annotated, Any, Dict
 
 from fastapi import Depends, FastAPI, HTTPException, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 
-from src.utils import send_message, verify_api_key
-from src import detect_intent, logging
-from src.schemas import (
-    WebhookRequest,
-    WebhookResponse,
-    FulfillmentResponse,
-    Message,
-    Text,
+from src.utils import verify_api_key
+from src import config, detect_intent, logging
+from src.json_logging import log_sample
+from src.schemas import WebhookRequest, WebhookResponse
+from src.registry import deadline, registry
+from src.fast_json import WebhookJSONResponse, parse_webhook_request
+from src.metrics import webhook_metrics
+from src.idempotency import webhook_idempotency
+from src.warmup import warm_up
+from src.whatsapp import SendError, whatsapp_sender
+
+# Importing the actions registers their tag handlers
+from src.actions import (  # noqa: F401
+    check_item_availability,
+    show_temp_summary,
+    remove_item,
+    show_summary,
+    confirm_order,
+    order_status,
 )
-from src.actions.check_item_availability import check_item_availabilty
-from src.actions.show_temp_summary import show_temp_summary
-from src.actions.remove_item import remove_item
-from src.actions.show_summary import show_summary
-from src.actions.confirm_order import confirm_order
-from src.actions.order_status import order_status
+from src.database import database
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Dialogflow CX Webhook API")
+# Imported by the first request needing them unless warmed up at startup
+WARM_UP_MODULES = [
+    "google.oauth2.service_account",
+    "google.cloud.dialogflowcx_v3",
+    "twilio.rest",
+    "twilio.http.async_http_client",
+]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    registry.log_tags(config.AGENT_TAGS)
+    await database.open_pool()
+    if config.RUN_STARTUP_TASKS:
+        await database.create_tables()
+    await database.load_catalog()
+    await webhook_idempotency.open()
+    await webhook_metrics.open()
+
+    async def warm_up_and_get_ready() -> None:
+        if config.WARM_UP:
+            await warm_up(WARM_UP_MODULES, [detect_intent.get_credentials])
+        app.state.ready = True
+
+    warm_up_task = asyncio.create_task(warm_up_and_get_ready())
+    yield
+    app.state.ready = False
+    warm_up_task.cancel()
+    await detect_intent.close_client()
+    await whatsapp_sender.close()
+    await webhook_metrics.close()
+    await webhook_idempotency.close()
+    await database.close_pool()
+
+
+app = FastAPI(title="Dialogflow CX Webhook API", lifespan=lifespan)
 
 templates = Jinja2Templates(directory="templates")
 
+registry.use(webhook_metrics.middleware)
+registry.use(
+    deadline(
+        config.WEBHOOK_DEADLINE_SECONDS,
+        registry.fallback_response,
+        config.WEBHOOK_TAG_DEADLINES,
+        on_fallback=webhook_metrics.record_fallback,
+    )
+)
+
 
 @app.get("/chat", response_class=HTMLResponse)
 async def read_item(request: Request):
     return templates.TemplateResponse(request=request, name="index.html")
 
 
-@app.post("/webhook", response_model=WebhookResponse)
-async def dialogflow_webhook(
-    webhook_request: WebhookRequest, is_verified: bool = Depends(verify_api_key)
-):
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        webhook_metrics.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness probe, 503 until the startup work and the warm-up are done."""
+    if not getattr(app.state, "ready", False):
+        return JSONResponse({"status": "starting"}, status_code=503)
+    return JSONResponse({"status": "ready"})
+
+
+@app.get("/db/stats")
+async def db_stats() -> Dict[str, Any]:
+    return {
+        "pool": database.pool.stats(),
+        "order_writer": database.order_writer.stats(),
+    }
+
+
+async def handle_webhook(webhook_request: WebhookRequest) -> WebhookResponse:
     try:
-        tag = webhook_request.fulfillmentInfo.tag
-        if tag == "checkItemAvailabilty":
-            return await check_item_availabilty(webhook_request=webhook_request)
-        elif tag == "showTempSummary":
-            return await show_temp_summary(webhook_request=webhook_request)
-        elif tag == "removeItem":
-            return await remove_item(webhook_request=webhook_request)
-        elif tag == "showSummary":
-            return await show_summary(webhook_request=webhook_request)
-        elif tag == "confirmOrder":
-            return await confirm_order(webhook_request=webhook_request)
-        elif tag == "orderStatus":
-            return await order_status(webhook_request=webhook_request)
-        else:
-            return WebhookResponse(
-                fulfillmentResponse=FulfillmentResponse(
-                    messages=[
-                        Message(text=Text(text=[f"No handler for the tag: {tag}"]))
-                    ]
-                )
-            )
+        return await registry.dispatch(webhook_request)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Webhook processing error: {str(e)}"
         )
 
 
+if config.WEBHOOK_FAST_JSON:
+
+    @app.post(
+        "/webhook",
+        response_model=WebhookResponse,
+        response_class=WebhookJSONResponse,
+    )
+    async def dialogflow_webhook(
+        request: Request,
+        is_verified: bool = Depends(verify_api_key),
+        webhook_request: WebhookRequest = Depends(parse_webhook_request),
+    ):
+        response = WebhookJSONResponse(await handle_webhook(webhook_request))
+        webhook_metrics.record_sizes(
+            webhook_request.fulfillmentInfo.tag,
+            len(await request.body()),
+            len(response.body),
+        )
+        return response
+
+else:
+
+    @app.post("/webhook", response_model=WebhookResponse)
+    async def dialogflow_webhook(
+        request: Request,
+        webhook_request: WebhookRequest,
+        is_verified: bool = Depends(verify_api_key),
+    ):
+        # Rendered here as FastAPI would render it, to know its size
+        response = JSONResponse(
+            jsonable_encoder(await handle_webhook(webhook_request))
+        )
+        webhook_metrics.record_sizes(
+            webhook_request.fulfillmentInfo.tag,
+            len(await request.body()),
+            len(response.body),
+        )
+        return response
+
+
 @app.post("/whatsapp")
 async def handle_post_whatsapp(form_data: Annotated[Dict[str, Any], Form]):
     """TODO
@@ -72,7 +167,7 @@ async def handle_post_whatsapp(form_data: Annotated[Dict[str, Any], Form]):
     (2) get all the messages that we want to send
     (3) send all messages
     """
-    logger.info(form_data)
+    log_sample(logger, "WhatsApp message", form_data)
     message = form_data["Body"]
     sender_id = form_data["From"]
 
@@ -83,8 +178,10 @@ async def handle_post_whatsapp(form_data: Annotated[Dict[str, Any], Form]):
     )
 
     if response_messages["status"]:
-        async for m in response_messages["message"]:
-            await send_message(to=sender_id, message=m)
+        try:
+            await whatsapp_sender.send(sender_id, *response_messages["messages"])
+        except SendError as e:
+            logger.error(str(e))
         return "OK"
     else:
         return "OK"
@@ -0,0 +1,231 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from src import logging
+from src.schemas import (
+    FulfillmentResponse,
+    Message,
+    Text,
+    WebhookRequest,
+    WebhookResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[WebhookRequest], Awaitable[WebhookResponse]]
+
+# A middleware gets the tag, the request and the next handler in the chain
+Middleware = Callable[[str, WebhookRequest, Handler], Awaitable[WebhookResponse]]
+
+# Monotonic time the request being handled has to be answered by
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class HandlerRegistry:
+    """
+    Maps fulfillment tags to handler coroutines.
+
+    Handlers register themselves with the handler decorator. Middleware can be
+    attached to one tag or to every tag, the chain of each tag is composed
+    once at registration, so a dispatch is a single dict lookup. A handler
+    can declare a fallback text, answered when it runs out of time.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: Dict[str, Handler] = {}
+        self._fallbacks: Dict[str, Optional[str]] = {}
+        self._tag_middleware: Dict[str, List[Middleware]] = {}
+        self._middleware: List[Middleware] = []
+        self._chains: Dict[str, Handler] = {}
+
+    def handler(
+        self,
+        tag: str,
+        middleware: Sequence[Middleware] = (),
+        fallback: Optional[str] = None,
+    ) -> Callable[[Handler], Handler]:
+        """Decorator registering a handler for a tag."""
+
+        def decorator(func: Handler) -> Handler:
+            self.register(tag, func, middleware=middleware, fallback=fallback)
+            return func
+
+        return decorator
+
+    def register(
+        self,
+        tag: str,
+        handler: Handler,
+        middleware: Sequence[Middleware] = (),
+        fallback: Optional[str] = None,
+    ) -> None:
+        if tag in self._handlers:
+            raise ValueError(f"A handler is already registered for the tag: {tag}")
+        self._handlers[tag] = handler
+        self._fallbacks[tag] = fallback
+        self._tag_middleware[tag] = list(middleware)
+        self._chains[tag] = self._compose(tag)
+
+    def use(self, middleware: Middleware) -> None:
+        """Attach a middleware to every tag, outermost first."""
+        self._middleware.append(middleware)
+        for tag in self._handlers:
+            self._chains[tag] = self._compose(tag)
+
+    def _compose(self, tag: str) -> Handler:
+        chain = self._handlers[tag]
+        for middleware in reversed(self._middleware + self._tag_middleware[tag]):
+            chain = _bind(middleware, tag, chain)
+        return chain
+
+    def tags(self) -> List[str]:
+        return sorted(self._handlers)
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self._handlers
+
+    def fallback_response(self, tag: str) -> Optional[WebhookResponse]:
+        """The response answered when the handler of a tag runs out of time."""
+        fallback = self._fallbacks.get(tag)
+        if fallback is None:
+            return None
+        return WebhookResponse(
+            fulfillmentResponse=FulfillmentResponse(
+                messages=[Message(text=Text(text=[fallback]))]
+            )
+        )
+
+    def check_tags(self, agent_tags: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        Compare the registered tags with the tags configured in the agent.
+
+        Args:
+            agent_tags: The fulfillment tags the agent sends
+
+        Returns:
+            (tags without a handler, handlers the agent never calls)
+        """
+        agent_tags = set(agent_tags)
+        registered = set(self._handlers)
+        return agent_tags - registered, registered - agent_tags
+
+    def log_tags(self, agent_tags: Iterable[str]) -> None:
+        """Log the registered tags and warn about any mismatch with the agent."""
+        logger.info(f"Registered tags: {', '.join(self.tags())}")
+        agent_tags = list(agent_tags)
+        if not agent_tags:
+            return
+        missing, unused = self.check_tags(agent_tags)
+        if missing:
+            logger.warning(
+                f"No handler for the agent tags: {', '.join(sorted(missing))}"
+            )
+        if unused:
+            logger.warning(
+                f"Handlers the agent never calls: {', '.join(sorted(unused))}"
+            )
+
+    async def dispatch(self, webhook_request: WebhookRequest) -> WebhookResponse:
+        tag = webhook_request.fulfillmentInfo.tag
+        chain = self._chains.get(tag)
+        if chain is None:
+            return WebhookResponse(
+                fulfillmentResponse=FulfillmentResponse(
+                    messages=[
+                        Message(text=Text(text=[f"No handler for the tag: {tag}"]))
+                    ]
+                )
+            )
+        return await chain(webhook_request)
+
+
+def _bind(middleware: Middleware, tag: str, call_next: Handler) -> Handler:
+    async def bound(webhook_request: WebhookRequest) -> WebhookResponse:
+        return await middleware(tag, webhook_request, call_next)
+
+    return bound
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left until the deadline of the request being handled.
+
+    Backends can use it to skip optional work when time runs short.
+
+    Returns:
+        The seconds left, or None outside of a deadline
+    """
+    deadline_at = _deadline.get()
+    if deadline_at is None:
+        return None
+    return max(0.0, deadline_at - time.monotonic())
+
+
+def deadline(
+    seconds: float,
+    fallback: Callable[[str], Optional[WebhookResponse]],
+    tag_seconds: Optional[Dict[str, float]] = None,
+    on_fallback: Optional[Callable[[str], None]] = None,
+) -> Middleware:
+    """
+    Middleware running every handler under a deadline budget.
+
+    The handler of a tag with a fallback response is cancelled when the
+    budget runs out and the fallback is answered instead. Handlers without
+    one, like the ones writing orders, always run to the end, they only see
+    the budget through remaining().
+
+    Args:
+        seconds: The budget of every tag
+        fallback: Returns the fallback response of a tag, or None
+        tag_seconds: Budgets of single tags overriding seconds
+        on_fallback: Called with the tag whenever a fallback is answered
+    """
+    tag_seconds = tag_seconds or {}
+
+    async def middleware(
+        tag: str, webhook_request: WebhookRequest, call_next: Handler
+    ) -> WebhookResponse:
+        budget = tag_seconds.get(tag, seconds)
+        token = _deadline.set(time.monotonic() + budget)
+        try:
+            response = fallback(tag)
+            if response is None:
+                return await call_next(webhook_request)
+            try:
+                return await asyncio.wait_for(call_next(webhook_request), budget)
+            except asyncio.TimeoutError:
+                logger.warning("Deadline of %s s exceeded for the tag: %s", budget, tag)
+                if on_fallback is not None:
+                    on_fallback(tag)
+                return response
+        finally:
+            _deadline.reset(token)
+
+    return middleware
+
+
+def timeout(seconds: float) -> Middleware:
+    """Middleware failing the request when the handler takes too long."""
+
+    async def middleware(
+        tag: str, webhook_request: WebhookRequest, call_next: Handler
+    ) -> WebhookResponse:
+        return await asyncio.wait_for(call_next(webhook_request), seconds)
+
+    return middleware
+
+
+registry = HandlerRegistry()
@@ -1,6 +1,7 @@
+from functools import cached_property
 from typing import Dict, List, Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class FulfillmentInfo(BaseModel):
@@ -69,6 +70,49 @@ class WebhookRequest(BaseModel):
     dtmfDigits: str | None = None
 
 
+_INTENT_INFO = TypeAdapter(IntentInfo | None)
+_PAGE_INFO = TypeAdapter(PageInfo | None)
+_MESSAGES = TypeAdapter(List[Message] | None)
+
+
+class LazyWebhookRequest(BaseModel):
+    """
+    WebhookRequest validating only the tag, the session and the plain string
+    fields eagerly.
+
+    intentInfo, pageInfo and messages are kept as parsed from the JSON and
+    validated with their model on first access, so a handler that never
+    reads them never pays for validating them.
+    """
+
+    detectIntentResponseId: str
+    languageCode: str
+    fulfillmentInfo: FulfillmentInfo | None = None
+    sessionInfo: SessionInfo | None = None
+    payload: Dict[str, Any] | None = None
+    text: str
+    triggerIntent: str | None = None
+    transcript: str | None = None
+    triggerEvent: str | None = None
+    dtmfDigits: str | None = None
+
+    raw_intentInfo: Any = Field(default=None, alias="intentInfo")
+    raw_pageInfo: Any = Field(default=None, alias="pageInfo")
+    raw_messages: Any = Field(default=None, alias="messages")
+
+    @cached_property
+    def intentInfo(self) -> IntentInfo | None:
+        return _INTENT_INFO.validate_python(self.raw_intentInfo)
+
+    @cached_property
+    def pageInfo(self) -> PageInfo | None:
+        return _PAGE_INFO.validate_python(self.raw_pageInfo)
+
+    @cached_property
+    def messages(self) -> List[Message] | None:
+        return _MESSAGES.validate_python(self.raw_messages)
+
+
 class FulfillmentResponse(BaseModel):
     messages: List[Message]
     mergeBehavior: Literal["MERGE_BEHAVIOR_UNSPECIFIED", "APPEND", "REPLACE"] = Field(
@@ -1,5 +1,4 @@
 from fastapi import HTTPException, status, Header
-from twilio.rest import Client
 from typing import Optional
 from src import config
 
@@ -19,20 +18,3 @@ async def verify_api_key(
             detail="Invalid API key",
         )
     return True
-
-
-client = Client(config.TWILIO_ACCOUNT_SID, config.TWILIO_AUTH_TOKEN)
-
-
-async def send_message(to: str, message: str) -> None:
-    """
-    Send message to a Telegram user.
-
-    Parameters:
-        - to(str): sender whatsapp number in this whatsapp:+919876543210 form
-        - message(str): text message to send
-
-    Returns:
-        - None
-    """
-    _ = await client.messages.create(from_="whatsapp:+14155238886", body=message, to=to)
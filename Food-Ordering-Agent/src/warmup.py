@@ -0,0 +1,42 @@
+import asyncio
+import importlib
+import time
+from typing import Any, Callable, Sequence
+
+from src import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up(
+    modules: Sequence[str], steps: Sequence[Callable[[], Any]] = ()
+) -> None:
+    """
+    Import heavy modules and build clients on a thread after startup.
+
+    The app answers webhooks meanwhile, a request needing one of them before
+    it is ready waits for it like it would have on a cold import. Failures
+    are logged, the request needing the client builds it again.
+
+    Args:
+        modules: Names of the modules to import
+        steps: Blocking functions run after the imports, in order
+    """
+    started = time.perf_counter()
+    for name in modules:
+        await _run(name, importlib.import_module, name)
+    for step in steps:
+        await _run(step.__name__, step)
+    logger.info("Warm-up done in %.0f ms", (time.perf_counter() - started) * 1000)
+
+
+async def _run(label: str, func: Callable[..., Any], *args: Any) -> None:
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(func, *args)
+    except Exception as e:
+        logger.warning("Warm-up of %s failed: %s", label, e)
+        return
+    logger.info(
+        "Warmed up %s in %.0f ms", label, (time.perf_counter() - started) * 1000
+    )
@@ -0,0 +1,136 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+from src import config, logging
+
+logger = logging.getLogger(__name__)
+
+# The twilio http client logs every request and its headers at INFO
+logging.getLogger("twilio.async_http_client").setLevel(logging.WARNING)
+
+
+class SendError(Exception):
+    """Twilio refused a message or could not be reached."""
+
+
+class WhatsAppSender:
+    """
+    Sends WhatsApp messages through the Twilio Messages API.
+
+    One twilio client per worker, on the library's AsyncTwilioHttpClient,
+    keeps its HTTPS connections to Twilio alive between messages, and at
+    most max_concurrency messages are in flight at once over all recipients.
+    The messages of one send call go out one after another, and send calls
+    for the same recipient are served in the order they were made, so
+    replies arrive in sequence while different customers are served in
+    parallel.
+    """
+
+    def __init__(
+        self,
+        account_sid: Optional[str],
+        auth_token: Optional[str],
+        from_: str,
+        api_url: str = "https://api.twilio.com",
+        max_concurrency: int = 16,
+        timeout: float = 10.0,
+    ) -> None:
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.from_ = from_
+        self.api_url = api_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        self._client = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Last send call queued per recipient, done once it is finished
+        self._tails: Dict[str, asyncio.Future] = {}
+
+        self.sent = 0
+        self.failed = 0
+
+    def _get_client(self):
+        # Imported here, like the Google clients it is warmed up by main.py
+        from twilio.http.async_http_client import AsyncTwilioHttpClient
+        from twilio.rest import Client
+
+        if self._client is None:
+            # The http client opens its aiohttp session, so it is built on
+            # the running loop by the first message
+            self._client = Client(
+                self.account_sid,
+                self.auth_token,
+                http_client=AsyncTwilioHttpClient(),
+            )
+            self._client.api.base_url = self.api_url
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def close(self) -> None:
+        """Close the pooled connections, called from the app lifespan."""
+        if self._client is not None:
+            await self._client.http_client.close()
+            self._client = None
+
+    async def send(self, to: str, *bodies: str) -> None:
+        """
+        Send messages to a recipient, in order.
+
+        Args:
+            to: Recipient in the whatsapp:+919876543210 form
+            bodies: Text of every message
+
+        Raises:
+            SendError: A message failed, the ones after it were not sent
+        """
+        previous = self._tails.get(to)
+        done = asyncio.get_running_loop().create_future()
+        self._tails[to] = done
+        try:
+            if previous is not None:
+                # Shielded, a cancelled send must not cancel the one before
+                await asyncio.shield(previous)
+            for body in bodies:
+                await self._send_one(to, body)
+        finally:
+            done.set_result(None)
+            if self._tails.get(to) is done:
+                del self._tails[to]
+
+    async def _send_one(self, to: str, body: str) -> Any:
+        import aiohttp
+        from twilio.base.exceptions import TwilioException, TwilioRestException
+
+        try:
+            client = self._get_client()
+            async with self._slots:
+                message = await asyncio.wait_for(
+                    client.messages.create_async(from_=self.from_, to=to, body=body),
+                    self.timeout,
+                )
+        except TwilioRestException as e:
+            self.failed += 1
+            raise SendError(
+                f"Twilio refused a WhatsApp message with {e.status}: {e.msg}"
+            ) from e
+        except (
+            TwilioException,
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            ValueError,
+        ) as e:
+            self.failed += 1
+            raise SendError(f"Error sending a WhatsApp message: {e!r}") from e
+
+        self.sent += 1
+        return message
+
+whatsapp_sender = WhatsAppSender(
+    account_sid=config.TWILIO_ACCOUNT_SID,
+    auth_token=config.TWILIO_AUTH_TOKEN,
+    from_=config.TWILIO_WHATSAPP_FROM,
+    api_url=config.TWILIO_API_URL,
+    max_concurrency=config.TWILIO_MAX_CONCURRENCY,
+    timeout=config.TWILIO_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,28 @@
+import io
+import json
+
+import pytest
+
+from src.database.importer import iter_json_array
+
+ARRAYS = [
+    "[0.1]",
+    "[1e5, -2.5E-3, 10, 0, 1.5e+2]",
+    '[{"price": 12.25, "synonyms": ["a", "b"]}, true, null, "x,]", 3]',
+    "[]",
+]
+
+
+@pytest.mark.parametrize("text", ARRAYS)
+def test_every_read_size_decodes_the_same(text):
+    expected = json.loads(text)
+    for read_size in range(1, len(text) + 2):
+        elements = list(iter_json_array(io.StringIO(text), read_size=read_size))
+        assert elements == expected, f"read_size={read_size}"
+
+
+@pytest.mark.parametrize("text", ["[01]", "[1 2]", "[1,", "{}"])
+def test_invalid_arrays_raise(text):
+    for read_size in range(1, len(text) + 2):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO(text), read_size=read_size))
@@ -0,0 +1,36 @@
+import asyncio
+import os
+import shutil
+
+import pytest
+
+from src.database.migrations import MIGRATIONS, check_query_plans, migrate
+from src.database.pool import ConnectionPool
+
+# Database shipped with the agent, migrated from its older schema
+SHIPPED_DB = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "food_database.db"
+)
+
+
+async def migrate_and_check(db_path: str):
+    pool = ConnectionPool(db_path, max_readers=1)
+    try:
+        version = await migrate(pool)
+        async with pool.reader() as db:
+            problems = await check_query_plans(db)
+    finally:
+        await pool.close()
+    return version, problems
+
+
+@pytest.mark.parametrize("source", [None, SHIPPED_DB], ids=["new", "shipped"])
+def test_hot_queries_use_their_indexes(tmp_path, source):
+    db_path = str(tmp_path / "food_database.db")
+    if source is not None:
+        shutil.copyfile(source, db_path)
+
+    version, problems = asyncio.run(migrate_and_check(db_path))
+
+    assert version == MIGRATIONS[-1][0]
+    assert problems == []
@@ -0,0 +1,43 @@
+"""
+Production entry point, several uvicorn workers and no reloader.
+
+On SIGTERM the workers stop accepting connections, finish the requests in
+flight for up to --graceful-timeout seconds and then run their shutdown.
+
+    python serve.py --workers 4 --port 5000
+
+run.py stays the development entry point with auto reload.
+"""
+
+import argparse
+import os
+
+import uvicorn
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "5000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+    )
+    # auto picks uvloop and httptools from requirements.txt when installed
+    parser.add_argument("--loop", default="auto")
+    parser.add_argument("--http", default="auto")
+    parser.add_argument("--graceful-timeout", type=int, default=10)
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        "src.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        access_log=args.access_log,
+    )
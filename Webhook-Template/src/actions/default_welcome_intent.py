@@ -6,8 +6,10 @@ from src.schemas import (
     Text,
     SessionInfo,
 )
+from src.registry import registry
 
 
+@registry.handler("defaultWelcomeIntent")
 async def default_welcome_intent(webhook_request: WebhookRequest) -> WebhookResponse:
     return WebhookResponse(
         fulfillmentResponse=FulfillmentResponse(
@@ -5,3 +5,17 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 
 X_API_KEY = os.getenv("X_API_KEY")
+
+# Comma separated fulfillment tags of the agent, checked against the handlers at startup
+AGENT_TAGS = [
+    tag.strip() for tag in os.getenv("AGENT_TAGS", "").split(",") if tag.strip()
+]
+
+# Validate webhook requests from the raw body and skip response re-validation
+WEBHOOK_FAST_JSON = os.getenv("WEBHOOK_FAST_JSON", "true").lower() == "true"
+
+# Validate intentInfo, pageInfo and messages only when a handler reads them,
+# needs WEBHOOK_FAST_JSON
+WEBHOOK_LAZY_VALIDATION = (
+    os.getenv("WEBHOOK_LAZY_VALIDATION", "false").lower() == "true"
+)
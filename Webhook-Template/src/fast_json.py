@@ -0,0 +1,86 @@
+from typing import Any
+
+import orjson
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+
+from src import config
+from src.schemas import LazyWebhookRequest, WebhookRequest, WebhookResponse
+
+
+def load_lazy_webhook_request(body: bytes) -> LazyWebhookRequest:
+    """
+    Decode a raw body and validate it with LazyWebhookRequest.
+
+    orjson builds the Python objects of a large body, like a long order
+    cart, in less than half the time pydantic-core does, and the lazy model
+    then validates only a few fields of them.
+    """
+    return LazyWebhookRequest.model_validate(orjson.loads(body))
+
+
+async def parse_webhook_request(request: Request) -> WebhookRequest:
+    """
+    Validate the webhook request straight from the raw body.
+
+    The bytes go to the pydantic-core parser in one step, no dict of the
+    whole body is built and validated afterwards. With lazy validation only
+    the tag, the session and the string fields are validated here.
+
+    Args:
+        request: The incoming request
+
+    Returns:
+        The validated webhook request
+    """
+    body = await request.body()
+    try:
+        if config.WEBHOOK_LAZY_VALIDATION:
+            return load_lazy_webhook_request(body)
+        return WebhookRequest.model_validate_json(body)
+    except orjson.JSONDecodeError as e:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", e.pos),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": e.msg},
+                }
+            ]
+        )
+    except ValidationError as e:
+        # Same error shape as a body validated by FastAPI
+        raise RequestValidationError(
+            [
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ]
+        )
+
+
+def encode_webhook_response(response: WebhookResponse) -> bytes:
+    """
+    Serialize a webhook response without the fields left at their default.
+
+    The models are built by our own handlers and already valid, so they are
+    serialized by pydantic-core directly to bytes without being validated
+    again. Defaults such as allowPlaybackInterruption=false, responseType and
+    mergeBehavior=APPEND are what Dialogflow assumes anyway.
+    """
+    return WebhookResponse.__pydantic_serializer__.to_json(
+        response, exclude_defaults=True
+    )
+
+
+class WebhookJSONResponse(JSONResponse):
+    """JSON response rendering a WebhookResponse with encode_webhook_response."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, WebhookResponse):
+            return encode_webhook_response(content)
+        return super().render(jsonable_encoder(content))
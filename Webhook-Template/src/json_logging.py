@@ -0,0 +1,127 @@
+import atexit
+import copy
+import datetime
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+import orjson
+from dotenv import find_dotenv, load_dotenv
+
+load_dotenv(find_dotenv())
+
+# DEBUG, INFO, WARNING or ERROR
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# "json" for one JSON object per line, "text" for the plain format
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+
+# Share of the calls to log_sample that log their full payload, 0 to 1
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has, anything else was passed through extra
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats a record as one JSON object, with its extra fields as keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, tz=datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key != "payload":
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+
+        line = orjson.dumps(entry, default=str)
+        # log_sample serialized the payload already, it goes in as is
+        payload = getattr(record, "payload", None)
+        if payload is not None:
+            line = line[:-1] + b',"payload":' + payload + b"}"
+        return line.decode("utf-8")
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Hands records over to the listener thread.
+
+    The message and any traceback are rendered here, where the arguments and
+    the exception are still current, the listener does the rest.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging() -> None:
+    """
+    Send every log record through a queue to a listener thread writing stdout.
+
+    Logging from a handler then only costs putting a record on the queue,
+    formatting and writing happen off the event loop.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        stream.setFormatter(JSONFormatter())
+    else:
+        stream.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [_QueueHandler(records)]
+    root.setLevel(LOG_LEVEL)
+
+    _listener = QueueListener(records, stream)
+    _listener.start()
+    # Write out what is still queued when the process exits
+    atexit.register(_listener.stop)
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return str(value)
+
+
+def log_sample(logger: logging.Logger, message: str, payload: Any) -> None:
+    """
+    Log a full payload, a request body or a cart, for LOG_SAMPLE_RATE of the
+    calls at INFO. The payload is serialized only when it gets logged.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    if LOG_SAMPLE_RATE < 1.0 and random.random() >= LOG_SAMPLE_RATE:
+        return
+    serialized = orjson.dumps(
+        payload, default=_jsonable, option=orjson.OPT_NON_STR_KEYS
+    )
+    if LOG_FORMAT == "json":
+        logger.info(message, extra={"payload": serialized})
+    else:
+        logger.info("%s %s", message, serialized.decode("utf-8"))
@@ -1,41 +1,69 @@
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 
 from src.utils import verify_api_key
-from src import logging
-from src.schemas import (
-    WebhookRequest,
-    WebhookResponse,
-    FulfillmentResponse,
-    Message,
-    Text,
-)
-from src.actions.default_welcome_intent import default_welcome_intent
+from src import config, logging
+from src.json_logging import log_sample
+from src.schemas import WebhookRequest, WebhookResponse
+from src.registry import registry
+from src.fast_json import WebhookJSONResponse, parse_webhook_request
+
+# Importing the actions registers their tag handlers
+from src.actions import default_welcome_intent  # noqa: F401
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Dialogflow CX Webhook API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    registry.log_tags(config.AGENT_TAGS)
+    app.state.ready = True
+    yield
+    app.state.ready = False
 
 
-@app.post("/webhook", response_model=WebhookResponse)
-async def dialogflow_webhook(
-    webhook_request: WebhookRequest, is_verified: bool = Depends(verify_api_key)
-):
+app = FastAPI(title="Dialogflow CX Webhook API", lifespan=lifespan)
+
+
+async def handle_webhook(webhook_request: WebhookRequest) -> WebhookResponse:
     logger.info("A new request came from Dialogflow.")
-    logger.info(webhook_request)
+    log_sample(logger, "Webhook request", webhook_request)
     try:
-        tag = webhook_request.fulfillmentInfo.tag
-        if tag == "defaultWelcomeIntent":
-            return await default_welcome_intent(webhook_request=webhook_request)
-        else:
-            return WebhookResponse(
-                fulfillmentResponse=FulfillmentResponse(
-                    messages=[
-                        Message(text=Text(text=[f"No handler for the tag: {tag}"]))
-                    ]
-                )
-            )
+        return await registry.dispatch(webhook_request)
     except Exception as e:
         logger.error(f"Error at /webhook {str(e)}")
         raise HTTPException(
             status_code=500, detail=f"Webhook processing error: {str(e)}"
         )
+
+
+if config.WEBHOOK_FAST_JSON:
+
+    @app.post(
+        "/webhook",
+        response_model=WebhookResponse,
+        response_class=WebhookJSONResponse,
+    )
+    async def dialogflow_webhook(
+        is_verified: bool = Depends(verify_api_key),
+        webhook_request: WebhookRequest = Depends(parse_webhook_request),
+    ):
+        return WebhookJSONResponse(await handle_webhook(webhook_request))
+
+else:
+
+    @app.post("/webhook", response_model=WebhookResponse)
+    async def dialogflow_webhook(
+        webhook_request: WebhookRequest, is_verified: bool = Depends(verify_api_key)
+    ):
+        return await handle_webhook(webhook_request)
+
+
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness probe, 503 until the app has started."""
+    if not getattr(app.state, "ready", False):
+        return JSONResponse({"status": "starting"}, status_code=503)
+    return JSONResponse({"status": "ready"})